@@ -1,27 +1,121 @@
-from contextlib import contextmanager
-from typing import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import threading
+from typing import AsyncIterator, Iterator
 
+from celery import current_task
+from celery.signals import task_postrun
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base, Session as SASession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base, Session as SASession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.settings import Settings
+from app.settings import get_settings
 
 
-settings = Settings()
+settings = get_settings()
 
-engine = create_engine(settings.postgres_url, echo=False, future=True)
+# Pools are sized per process (DB_POOL_SIZE / DB_MAX_OVERFLOW, see settings): with
+# UVICORN_WORKERS=4 and both engines that is 4 * 2 * (5 + 5) = 80 connections per
+# pod at most, under Postgres' default max_connections=100. Stale connections are
+# handled by recycling rather than a per-checkout pre-ping.
+engine = create_engine(
+    settings.postgres_url,
+    echo=False,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=30,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=1800,  # well under Postgres/proxy idle timeouts
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+# One Session per HTTP request / Celery task instead of one per `with Session()`.
+# The API middleware sets `request_scope`; inside a worker the task id is used.
+request_scope: ContextVar[str | None] = ContextVar("db_request_scope", default=None)
+
+
+def _scope_key():
+    key = request_scope.get()
+    if key is not None:
+        return key
+    # current_task is a Proxy (never None); it is falsy outside a task
+    if current_task and current_task.request.id:
+        return current_task.request.id
+    return threading.get_ident()
+
+
+ScopedSession = scoped_session(SessionLocal, scopefunc=_scope_key)
+
+
+@task_postrun.connect
+def _remove_task_session(**_kwargs) -> None:
+    ScopedSession.remove()
+
+# Async engine for the FastAPI routes so DB I/O doesn't block the event loop.
+# Celery workers are sync and keep using `engine` / `Session()` above.
+async_engine = create_async_engine(
+    make_url(settings.postgres_url).set(drivername="postgresql+asyncpg"),
+    echo=False,
+    poolclass=AsyncAdaptedQueuePool,  # plain QueuePool is not asyncio-safe
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=30,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=1800,  # well under Postgres/proxy idle timeouts
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
 
+def _pool_stats(pool) -> dict:
+    return {
+        "status": pool.status(),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def pool_status() -> dict:
+    """Snapshot of connection pool usage (for /admin/db/pool)."""
+    return {"sync": _pool_stats(engine.pool), "async": _pool_stats(async_engine.pool)}
+
+
 @contextmanager
 def Session() -> Iterator[SASession]:
-    session = SessionLocal()
+    """
+    The request/task's scoped session (closed by ScopedSession.remove() when the
+    request/task ends). Nested `with Session()` blocks share it and join the
+    outermost block's transaction: only the outermost block commits, or rolls
+    back if an exception escapes it; inner blocks just re-raise.
+    """
+    session = ScopedSession()
+    depth = session.info.get("session_depth", 0)
+    session.info["session_depth"] = depth + 1
     try:
         yield session
-        session.commit()
+        if depth == 0:
+            session.commit()
     except Exception:
-        session.rollback()
+        if depth == 0:
+            session.rollback()
         raise
     finally:
-        session.close()
+        session.info["session_depth"] = depth
+
+
+@asynccontextmanager
+async def async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+import uuid
+
+from fastapi import FastAPI, Request
 
 from app.routes import admin, webhooks
+from app.settings import S
 
 
 def create_app() -> FastAPI:
@@ -14,6 +17,18 @@ def create_app() -> FastAPI:
     def healthz():
         return {"ok": True}
 
+    if S.postgres_url:
+        from app.db import ScopedSession, request_scope
+
+        @application.middleware("http")
+        async def db_session_scope(request: Request, call_next):
+            token = request_scope.set(uuid.uuid4().hex)
+            try:
+                return await call_next(request)
+            finally:
+                ScopedSession.remove()
+                request_scope.reset(token)
+
     application.include_router(admin.router)
     application.include_router(webhooks.router)
     return application
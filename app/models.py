@@ -1,9 +1,23 @@
-from sqlalchemy import Column, Integer, String, Boolean, BigInteger, ForeignKey, Text, TIMESTAMP
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, ForeignKey, Text, TIMESTAMP, insert
+from sqlalchemy.orm import relationship, Session
 
 from app.db import Base
 
 
+class BulkInsertMixin:
+    @classmethod
+    def bulk_create(cls, session: Session, rows: list[dict]) -> list[int]:
+        """
+        Insert many rows as batched multi-row INSERT ... RETURNING id
+        (one round-trip per page) instead of one INSERT per session.add().
+        Ids come back in the order of `rows`, so callers can zip them.
+        """
+        if not rows:
+            return []
+        stmt = insert(cls).returning(cls.id, sort_by_parameter_order=True)
+        return list(session.execute(stmt, rows).scalars())
+
+
 class Creator(Base):
     __tablename__ = "creators"
 
@@ -21,7 +35,7 @@ class Creator(Base):
     videos = relationship("Video", back_populates="creator")
 
 
-class Video(Base):
+class Video(BulkInsertMixin, Base):
     __tablename__ = "videos"
 
     id = Column(BigInteger, primary_key=True)
@@ -36,7 +50,7 @@ class Video(Base):
     clips = relationship("Clip", back_populates="video")
 
 
-class Clip(Base):
+class Clip(BulkInsertMixin, Base):
     __tablename__ = "clips"
 
     id = Column(BigInteger, primary_key=True)
@@ -55,7 +69,7 @@ class Clip(Base):
     uploads = relationship("Upload", back_populates="clip")
 
 
-class Upload(Base):
+class Upload(BulkInsertMixin, Base):
     __tablename__ = "uploads"
 
     id = Column(BigInteger, primary_key=True)
@@ -6,11 +6,15 @@
 
 from __future__ import annotations
 
+import os
+
 from celery import Celery
 from celery.schedules import crontab
 
 from app.settings import S as settings
 
+__all__ = ["celery_app"]
+
 # Create Celery app using broker/backend from Settings (with sane fallbacks)
 celery_app = Celery(
     "autoclipper",
@@ -23,20 +27,41 @@ celery_app.set_default()
 
 # Autodiscover tasks inside app.workers.* so you don't need to list modules manually
 celery_app.autodiscover_tasks(["app.workers"])
+# autodiscover only picks up `tasks.py`; beat.py holds cleanup_tmp
+celery_app.conf.include = ["app.workers.beat"]
 
 # Retry connecting to the broker on startup (container may start before Redis is ready)
 celery_app.conf.broker_connection_retry_on_startup = True
 
+# Broker/worker tuning: short orchestration tasks shouldn't wait on Redis poll
+# granularity, and long video tasks need a visibility timeout past their runtime.
+celery_app.conf.update(
+    broker_transport_options={"visibility_timeout": 5400, "polling_interval": 0.01},
+    task_ignore_result=True,       # fire-and-forget by default; opt in per task
+    worker_prefetch_multiplier=1,  # don't let one process hoard long cpu tasks
+    task_acks_late=False,
+    # parallel ffmpeg renders: bound concurrency. Children are NOT recycled globally:
+    # the cpu workers keep the Whisper model warm; only the render service recycles
+    # (--max-tasks-per-child in docker-compose.yml).
+    worker_concurrency=min(os.cpu_count() or 1, 4),
+    worker_redirect_stdouts=False,  # tasks log through `logging`, not print
+)
+
 # Task routing: keep your CPU queue for heavy steps, default for light steps
 celery_app.conf.task_routes = {
     # Heavy CPU-ish tasks (ffmpeg, ASR, etc.)
     "app.workers.tasks.process_video": {"queue": "cpu"},
-    "app.workers.tasks.publish_clip": {"queue": "cpu"},
+    # ffmpeg renders: own queue so their workers can recycle without dropping the ASR model
+    "app.workers.tasks.render_clip_task": {"queue": "render"},
+    # Uploads are slow + network-bound: their own queue/worker so renders never wait on YouTube
+    "app.workers.tasks.publish_clip": {"queue": "upload"},
 
     # Light tasks / orchestration
     "app.workers.tasks.poll_creators": {"queue": "default"},
     "app.workers.tasks.auto_pipeline": {"queue": "default"},
+    "app.workers.tasks.expand_and_render": {"queue": "default"},
     "app.workers.tasks.discover_campaigns_task": {"queue": "default"},
+    "app.workers.tasks.check_claim_then_publish": {"queue": "default"},
 
     # Cleanup task lives in app.workers.beat
     "app.workers.beat.cleanup_tmp": {"queue": "default"},
@@ -44,18 +69,20 @@ celery_app.conf.task_routes = {
 
 # -------- Celery Beat (periodic tasks) --------
 # Keep ALL schedules here, so Beat only needs this module.
+# The two YouTube-facing jobs are pinned to crontab minutes that never coincide,
+# so they don't hit the API (and the broker) on the same beat tick.
 celery_app.conf.beat_schedule = {
-    # (Debug/visibility) Poll allowlisted creators every 15 minutes.
-    # If you enable auto_pipeline below, you can remove this to avoid duplicate work.
+    # (Debug/visibility) Poll allowlisted creators every 15 minutes. Read-only: it
+    # reports unseen ids without marking them, so auto_pipeline still picks them up.
     "poll-creators-15min": {
         "task": "app.workers.tasks.poll_creators",
-        "schedule": 15 * 60,  # seconds
+        "schedule": crontab(minute="7-59/15"),  # :07 :22 :37 :52
     },
 
     # End-to-end automation: discover new videos and enqueue full pipeline every 10 minutes.
     "auto-pipeline-every-10-min": {
         "task": "app.workers.tasks.auto_pipeline",
-        "schedule": 10 * 60,  # seconds
+        "schedule": crontab(minute="*/10"),  # :00 :10 ... :50
     },
 
     # Cleanup tmp files (media/clips) older than 24h, every 6 hours.
@@ -74,3 +101,5 @@ celery_app.conf.beat_schedule = {
 }
 
 celery_app.conf.timezone = "UTC"
+# Static schedule: wake at least once a minute to check for due entries
+celery_app.conf.beat_max_loop_interval = 60
@@ -1,21 +1,36 @@
 from fastapi import APIRouter
 
+from app.queues import celery_app
+from app.services.intake.allowlist_manager import load_allowlist
+from app.settings import S
+
 router = APIRouter(prefix="/admin")
 
 
 @router.get("/ping")
-def ping_admin():
+async def ping_admin():
     return {"msg": "admin ok"}
 
 
+# Handlers that block (broker publish, YAML parse) stay sync so FastAPI runs them
+# on its threadpool instead of the event loop.
 @router.post("/rescan")
 def rescan():
-    from app.workers.tasks import poll_creators
-    poll_creators.delay()
+    # by name: avoids importing the task module (ASR/ffmpeg/LLM deps) into the API
+    celery_app.send_task("app.workers.tasks.poll_creators")
     return {"ok": True}
 
 
 @router.get("/creators")
 def list_creators():
-    # return allowlist + db status
-    return {"creators": []}
+    # served from the mtime-checked allowlist cache
+    return {"creators": load_allowlist()}
+
+
+@router.get("/db/pool")
+def db_pool():
+    # DB is optional in v1: only touch the engine when Postgres is configured
+    if not S.postgres_url:
+        return {"enabled": False}
+    from app.db import pool_status
+    return {"enabled": True, **pool_status()}
@@ -4,5 +4,5 @@ router = APIRouter(prefix="/webhooks")
 
 
 @router.post("/youtube/processing-complete")
-def yt_processing_complete():
+async def yt_processing_complete():
     return {"ok": True}
@@ -0,0 +1,56 @@
+# app/services/analyze/audio.py
+from __future__ import annotations
+import shutil
+import subprocess
+from typing import List, Tuple
+
+import numpy as np
+
+# Audio features are optional: without ffmpeg on PATH callers skip them.
+HAVE_FFMPEG = shutil.which("ffmpeg") is not None
+AUDIO_SAMPLE_RATE = 16000
+
+
+def _window_rms(pcm: bytes, win: int) -> np.ndarray:
+    x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    return np.sqrt(np.mean(x.reshape(-1, win) ** 2, axis=1))
+
+
+def audio_energy_series(media_path: str, win_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Windowed RMS loudness over the media's audio track.
+    Returns (seconds, db) arrays with one entry per `win_ms` window.
+    """
+    win = AUDIO_SAMPLE_RATE * win_ms // 1000
+    if win <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    # Stream mono 16 kHz PCM straight from ffmpeg's stdout (no temp WAV) and
+    # reduce ~1 MiB of whole windows at a time, so RSS stays bounded on long VODs.
+    win_bytes = win * 2  # s16le
+    read_bytes = win_bytes * max(1, (1 << 20) // win_bytes)
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", media_path,
+           "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-f", "s16le", "-"]
+    parts: List[np.ndarray] = []
+    tail = b""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=1 << 20) as proc:
+        while True:
+            buf = proc.stdout.read(read_bytes)
+            if not buf:
+                break
+            buf = tail + buf
+            n = len(buf) - len(buf) % win_bytes
+            tail = buf[n:]
+            if n:
+                parts.append(_window_rms(buf[:n], win))
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+    tail = tail[: len(tail) - len(tail) % 2]
+    if tail:  # zero-pad the final partial window
+        parts.append(_window_rms(tail + bytes(win_bytes - len(tail)), win))
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    rms = np.concatenate(parts)
+    # convert to pseudo-dB for stability
+    db = 20 * np.log10(np.maximum(rms, 1))
+    secs = (np.arange(db.size) * win_ms) // 1000
+    return secs, db
@@ -1,17 +1,31 @@
-from scenedetect import VideoManager, SceneManager
+import numpy as np
+from scenedetect import open_video, SceneManager
 from scenedetect.detectors import ContentDetector
 
+MIN_SCENE_S = 12
+MAX_SCENE_S = 80
+FRAME_SKIP = 2  # analyze every 3rd frame; plenty for 12s+ scene cuts
+
+def _open(media_path):
+    # PyAV decodes straight to frames without OpenCV's extra BGR copy; fall back if missing
+    try:
+        return open_video(media_path, backend="pyav")
+    except Exception:
+        return open_video(media_path)
+
 def find_candidate_segments(media_path, transcript_text):
     # scenes + amplitude peaks → short windows (20–60s)
-    vm = VideoManager([media_path])
+    video = _open(media_path)
     sm = SceneManager()
+    # default min_scene_len: short shots must still split windows; the 12-80s filter below
+    # only drops them (a 12s min_scene_len would merge them into new candidates)
     sm.add_detector(ContentDetector(threshold=27.0))
-    vm.start(); sm.detect_scenes(frame_source=vm)
+    sm.detect_scenes(video=video, frame_skip=FRAME_SKIP, show_progress=False)
     scenes = sm.get_scene_list()
+    if not scenes:
+        return []
     # convert to candidate windows (start, end) and attach transcript slices
-    candidates = []
-    for s, e in scenes:
-        dur = (e.get_seconds() - s.get_seconds())
-        if 12 <= dur <= 80:
-            candidates.append({"start": int(s.get_seconds()), "end": int(e.get_seconds())})
-    return candidates[:30]  # cap
+    bounds = np.array([(s.get_seconds(), e.get_seconds()) for s, e in scenes])
+    dur = bounds[:, 1] - bounds[:, 0]
+    keep = bounds[(dur >= MIN_SCENE_S) & (dur <= MAX_SCENE_S)][:30]  # cap
+    return [{"start": int(s), "end": int(e)} for s, e in keep.tolist()]
@@ -1,23 +1,29 @@
 # app/services/analyze/scoring.py
 from __future__ import annotations
-import json
 import math
 import os
 import re
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import List, Dict, NamedTuple, Tuple, Optional
 
-try:
-    # Optional: better audio energy. If missing, we degrade gracefully.
-    from pydub import AudioSegment
-    HAVE_PYDUB = True
-except Exception:
-    HAVE_PYDUB = False
+import numpy as np
+import orjson
+
+try:  # optional: stream very large (per-word WhisperX) transcripts
+    import ijson
+    HAVE_IJSON = True
+except ImportError:
+    HAVE_IJSON = False
+
+# Optional: audio energy needs ffmpeg. If missing, we degrade gracefully.
+from app.services.analyze.audio import HAVE_FFMPEG, audio_energy_series
 
 
 # ------------ Public API ------------
 
-@dataclass
+@dataclass(frozen=True, eq=True)
 class ScoreConfig:
     # target clip duration for Shorts; tweak per creator via preset
     min_len_s: int = 18
@@ -59,11 +65,34 @@ class ScoreConfig:
     )
 
 
-@dataclass
-class Segment:
-    start: float
-    end: float
-    text: str
+@lru_cache(maxsize=8)
+def _compiled(cfg: ScoreConfig) -> SimpleNamespace:
+    """Compiled lexicons, built once per distinct (hashable) ScoreConfig."""
+    return SimpleNamespace(
+        excite=_fuse(cfg.excite_keywords),
+        laughter=_fuse(cfg.laughter_tokens),
+        positive=_fuse(cfg.positive_words),
+        negative=_fuse(cfg.negative_words),
+        ban=_fuse(cfg.ban_words),
+        nsfw=_fuse(cfg.nsfw_words),
+    )
+
+
+def _fuse(patterns: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    One case-insensitive regex matching any of `patterns` (None if empty).
+    Each pattern gets its own named group so callers can tell which matched.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?P<p{i}>{p})" for i, p in enumerate(patterns)), re.IGNORECASE)
+
+
+class Transcript(NamedTuple):
+    """Transcript segments as parallel arrays (sorted by time), built once per scoring run."""
+    starts: np.ndarray
+    ends: np.ndarray
+    texts: List[str]
 
 
 def score_candidates(
@@ -86,39 +115,46 @@ def score_candidates(
     }
     """
     cfg = cfg or ScoreConfig()
+    lex = _compiled(cfg)
 
-    segments = _load_transcript_segments(transcript_json_path)
-    # Precompute simple per-second text features
-    per_s_text = _index_text_features(segments)
+    transcript = _load_transcript(transcript_json_path)
 
     # Optional audio energy (RMS)
     energy = None
-    if HAVE_PYDUB and os.path.exists(media_path):
+    if HAVE_FFMPEG and os.path.exists(media_path):
         try:
-            energy = _audio_energy_series(media_path, cfg.energy_win_ms)
+            energy = _energy_index(*audio_energy_series(media_path, cfg.energy_win_ms))
         except Exception:
             energy = None
 
     results = []
+    # text-derived components per (start, end); deduped windows can still repeat
+    text_cache: Dict[Tuple[int, int], Tuple] = {}
     for c in candidates:
         s = int(max(0, c["start"]))
         e = int(c["end"])
         dur = max(0.0, e - s)
-        window_text = _slice_text(segments, s, e)
-
-        # Component scores
-        k_keywords, has_laugh = _keyword_score(window_text, cfg)
-        k_marks = _punctuation_score(window_text)
-        k_sent = _sentiment_score(window_text, cfg)
-        k_pace = _pace_score(window_text, dur)
-        k_cohesion = _cohesion_score(window_text)
+
+        cached = text_cache.get((s, e))
+        if cached is None:
+            window_text = _slice_text(transcript, s, e)
+            cached = text_cache[(s, e)] = (
+                window_text,
+                # Component scores
+                *_keyword_score(window_text, lex),
+                _punctuation_score(window_text),
+                _sentiment_score(window_text, lex),
+                _pace_score(window_text, dur),
+                _cohesion_score(window_text),
+                # Safety flags
+                _contains_any(window_text, lex.ban),
+                _contains_any(window_text, lex.nsfw),
+            )
+        (window_text, k_keywords, has_laugh, k_marks, k_sent,
+         k_pace, k_cohesion, has_ban, has_nsfw) = cached
         k_energy = _energy_score(energy, s, e) if energy is not None else 0.0
         k_lenfit = _length_fit_score(dur, cfg)
 
-        # Safety flags
-        has_ban = _contains_any(window_text, cfg.ban_words)
-        has_nsfw = _contains_any(window_text, cfg.nsfw_words)
-
         # Weighted sum
         composite = (
             cfg.w_keywords * k_keywords
@@ -165,58 +201,49 @@ def score_candidates(
 
 # ------------ Internals ------------
 
-def _load_transcript_segments(path: str) -> List[Segment]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    segs = []
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]+")
+_SETUP_CUE_RE = re.compile(r"\b(when|then|after|because|so|and then)\b", re.IGNORECASE)
+
+# above this size, stream segments with ijson instead of parsing the whole tree
+_STREAM_TRANSCRIPT_BYTES = 16 * 1024 * 1024
+
+def _load_transcript(path: str) -> Transcript:
     # Support Whisper/WhisperX JSON structure
-    for s in data.get("segments", []):
+    if HAVE_IJSON and os.path.getsize(path) > _STREAM_TRANSCRIPT_BYTES:
+        with open(path, "rb") as f:
+            return _transcript_from(ijson.items(f, "segments.item", use_float=True))
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    return _transcript_from(data.get("segments", []))
+
+
+def _transcript_from(segments) -> Transcript:
+    """Single pass over raw segment dicts into the SoA Transcript."""
+    starts: List[float] = []
+    ends: List[float] = []
+    texts: List[str] = []
+    for s in segments:
         start = float(s.get("start", 0.0))
-        end = float(s.get("end", start))
-        text = s.get("text", "")
-        segs.append(Segment(start, end, text))
-    return segs
+        starts.append(start)
+        ends.append(float(s.get("end", start)))
+        texts.append(s.get("text", "").strip())
+    return Transcript(np.array(starts, dtype=np.float64), np.array(ends, dtype=np.float64), texts)
 
 
-def _index_text_features(segments: List[Segment]) -> Dict[int, Dict]:
-    """
-    Rough per-second features (currently unused by default scoring, but useful
-    if you later want heatmaps). Returns dict: sec -> {"chars": int, "exclaim": int, ...}
-    """
-    idx: Dict[int, Dict[str, int]] = {}
-    for seg in segments:
-        s = int(math.floor(seg.start))
-        e = int(math.ceil(seg.end))
-        for t in range(s, e + 1):
-            if t not in idx:
-                idx[t] = {"chars": 0, "exclaim": 0, "question": 0}
-            idx[t]["chars"] += len(seg.text)
-            idx[t]["exclaim"] += seg.text.count("!")
-            idx[t]["question"] += seg.text.count("?")
-    return idx
-
-
-def _slice_text(segments: List[Segment], start_s: int, end_s: int) -> str:
-    buf = []
-    for seg in segments:
-        if seg.end < start_s: 
-            continue
-        if seg.start > end_s:
-            break
-        buf.append(seg.text.strip())
-    return " ".join(buf)
-
-
-def _keyword_score(text: str, cfg: ScoreConfig) -> Tuple[float, bool]:
+def _slice_text(tr: Transcript, start_s: int, end_s: int) -> str:
+    # segments with end >= start_s and start <= end_s, located in O(log M)
+    lo = int(np.searchsorted(tr.ends, start_s, side="left"))
+    hi = int(np.searchsorted(tr.starts, end_s, side="right"))
+    return " ".join(tr.texts[lo:hi])
+
+
+def _keyword_score(text: str, lex: SimpleNamespace) -> Tuple[float, bool]:
     """
     Score presence of excitement keywords and laughter tokens.
     Returns (score, has_laughter).
     """
-    t = text.lower()
-    score = 0.0
-    for pat in cfg.excite_keywords:
-        score += 1.0 if re.search(pat, t) else 0.0
-    has_laugh = any(re.search(p, t) for p in cfg.laughter_tokens)
+    score = float(_count_patterns(text, lex.excite))
+    has_laugh = _contains_any(text, lex.laughter)
     # small bonus for laughter
     if has_laugh:
         score += 0.5
@@ -232,14 +259,13 @@ def _punctuation_score(text: str) -> Dict[str, float]:
     return {"exclaim": min(ex, 1.5), "question": min(qn, 1.0)}
 
 
-def _sentiment_score(text: str, cfg: ScoreConfig) -> float:
+def _sentiment_score(text: str, lex: SimpleNamespace) -> float:
     """
     Very lightweight lexicon polarity. Positive OR negative emotion
     can both be "clippable". We score absolute polarity.
     """
-    t = text.lower()
-    pos = sum(1 for p in cfg.positive_words if re.search(p, t))
-    neg = sum(1 for p in cfg.negative_words if re.search(p, t))
+    pos = _count_patterns(text, lex.positive)
+    neg = _count_patterns(text, lex.negative)
     return min(abs(pos - neg) + (pos + neg) * 0.3, 3.0)
 
 
@@ -256,11 +282,12 @@ def _pace_score(text: str, dur_s: float) -> float:
 
 def _cohesion_score(text: str) -> float:
     # Self-contained moment heuristic: short sentences with at least one cue
-    sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
+    sentences = [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
     if not sentences:
         return 0.0
     avg_len = sum(len(s.split()) for s in sentences) / len(sentences)
-    has_setup = any(re.search(r"\b(when|then|after|because|so|and then)\b", s.lower()) for s in sentences)
+    # cue words never span punctuation, so one scan of the whole text suffices
+    has_setup = _SETUP_CUE_RE.search(text) is not None
     base = 1.0 if (6 <= avg_len <= 22) else 0.5
     if has_setup:
         base += 0.3
@@ -279,38 +306,39 @@ def _length_fit_score(dur_s: float, cfg: ScoreConfig) -> float:
     return max(0.0, 1.0 - abs(dur_s - center) / (span * 2))
 
 
-def _contains_any(text: str, patterns: Tuple[str, ...]) -> bool:
-    t = text.lower()
-    return any(re.search(p, t) for p in patterns)
+def _contains_any(text: str, pattern: Optional[re.Pattern]) -> bool:
+    return pattern is not None and pattern.search(text) is not None
+
 
+def _count_patterns(text: str, pattern: Optional[re.Pattern]) -> int:
+    """How many of the fused lexicon's patterns occur in `text` (single scan)."""
+    if pattern is None:
+        return 0
+    return len({m.lastgroup for m in pattern.finditer(text)})
 
-def _audio_energy_series(media_path: str, win_ms: int) -> List[Tuple[int, float]]:
+
+def _energy_index(secs: np.ndarray, db: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
     """
-    Return list of (second, rms_dbfs) pairs sampled over the media.
+    Per-transcript energy lookup: window timestamps, prefix sums of dB and the
+    robust baseline (10th percentile over the series), computed once so each
+    candidate is two binary searches and a subtraction.
     """
-    audio = AudioSegment.from_file(media_path)  # ffmpeg-backed; auto-detects
-    # Downmix to mono for stability
-    audio = audio.set_channels(1)
-    step = win_ms
-    out: List[Tuple[int, float]] = []
-    for i in range(0, len(audio), step):
-        frame = audio[i:i + step]
-        sec = i // 1000
-        out.append((int(sec), frame.rms if frame.rms > 0 else 1))
-    # convert to dBFS-like scale
-    out_db = [(t, 20.0 * math.log10(v)) for (t, v) in out]
-    return out_db
-
-
-def _energy_score(series: List[Tuple[int, float]], start_s: int, end_s: int) -> float:
-    if not series:
-        return 0.0
-    window = [v for (t, v) in series if start_s <= t <= end_s]
-    if not window:
+    db = np.asarray(db, dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(db)))
+    if db.size == 0:
+        return secs, csum, 0.0
+    k = max(0, int(0.1 * db.size) - 1)
+    baseline = float(np.partition(db, k)[k])
+    return secs, csum, baseline
+
+
+def _energy_score(energy: Tuple[np.ndarray, np.ndarray, float], start_s: int, end_s: int) -> float:
+    secs, csum, baseline = energy
+    # windows with start_s <= sec <= end_s (secs is sorted)
+    lo = int(np.searchsorted(secs, start_s, side="left"))
+    hi = int(np.searchsorted(secs, end_s, side="right"))
+    if hi <= lo:
         return 0.0
-    avg = sum(window) / len(window)
-    # Normalize by a robust baseline (10th percentile over series)
-    vals = [v for _, v in series]
-    vals_sorted = sorted(vals)
-    baseline = vals_sorted[max(0, int(0.1 * len(vals_sorted)) - 1)]
+    avg = (csum[hi] - csum[lo]) / (hi - lo)
+    # Normalize by the robust baseline
     return max(0.0, (avg - baseline) / 10.0)  # roughly 0..~2
@@ -1,18 +1,45 @@
+import os
+from functools import lru_cache
 from pathlib import Path
-import json
+import orjson
 
-def transcribe_or_load(media_path: str, video_id: str, model_size: str = "medium"):
+from app.settings import S
+
+
+@lru_cache(maxsize=1)
+def _model(model_size: str):
+    # Loaded once per worker process. On GPU int8 weights + fp16 compute halves VRAM
+    # vs float16; CPU-only workers run int8 across all cores instead of failing over.
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    if ctranslate2.get_cuda_device_count() > 0:
+        return WhisperModel(model_size, device="cuda", compute_type="int8_float16")
+    return WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=os.cpu_count() or 1)
+
+
+@lru_cache(maxsize=1)
+def _batched(model_size: str):
+    from faster_whisper import BatchedInferencePipeline
+    return BatchedInferencePipeline(model=_model(model_size))
+
+
+@lru_cache(maxsize=1)
+def _cpu_model(model_size: str):
+    import whisper  # openai/whisper
+    return whisper.load_model(model_size)
+
+
+def transcribe_or_load(media_path: str, video_id: str, model_size: str | None = None):
+    model_size = model_size or S.whisper_model
     out = Path("tmp/transcripts"); out.mkdir(parents=True, exist_ok=True)
     out_json = out / f"{video_id}.json"
     if out_json.exists():
-        data = json.loads(out_json.read_text())
+        data = orjson.loads(out_json.read_bytes())
         return str(out_json), data.get("text", "")
 
     # Lazy import + robust fallback
     try:
-        from faster_whisper import WhisperModel
-        model = WhisperModel(model_size, device="cuda", compute_type="float16")
-        segments, info = model.transcribe(media_path, vad_filter=True)
+        segments, info = _batched(model_size).transcribe(media_path, vad_filter=True, batch_size=S.whisper_batch_size)
         segs, texts = [], []
         for s in segments:
             segs.append({"id": getattr(s, "id", None), "start": s.start, "end": s.end, "text": s.text.strip()})
@@ -21,11 +48,10 @@ def transcribe_or_load(media_path: str, video_id: str, model_size: str = "medium
     except Exception as e:
         # Fallback to CPU whisper (PyTorch) so pipeline still works
         print(f"[transcribe] faster-whisper failed ({e}); falling back to CPU whisper.")
-        import whisper  # openai/whisper
-        model = whisper.load_model("medium")  # CPU
+        model = _cpu_model("medium")  # CPU
         res = model.transcribe(media_path)
         segs = [{"id": i, "start": s["start"], "end": s["end"], "text": s["text"].strip()} for i, s in enumerate(res.get("segments", []))]
         data = {"language": res.get("language"), "text": res.get("text", ""), "segments": segs}
 
-    out_json.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+    out_json.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     return str(out_json), data["text"]
@@ -1,17 +1,16 @@
 # app/services/clipper/candidate_maker.py
 from __future__ import annotations
-import json
-import math
+import bisect
 import os
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 
-try:
-    from pydub import AudioSegment
-    HAVE_PYDUB = True
-except Exception:
-    HAVE_PYDUB = False
+import numpy as np
+import orjson
+
+from app.services.analyze.audio import HAVE_FFMPEG, audio_energy_series
 
 
 @dataclass
@@ -36,22 +35,25 @@ class CandidateConfig:
 
 
 def _load_transcript_segments(transcript_json_path: str) -> List[Dict]:
-    with open(transcript_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(transcript_json_path, "rb") as f:
+        data = orjson.loads(f.read())
     return data.get("segments", [])
 
 
-def _slice_text(segments: List[Dict], start_s: int, end_s: int) -> str:
-    out = []
-    for seg in segments:
-        st = float(seg.get("start", 0))
-        en = float(seg.get("end", st))
-        if en < start_s:
-            continue
-        if st > end_s:
-            break
-        out.append(seg.get("text", "").strip())
-    text = " ".join(out).strip()
+def _segment_bounds(segments: List[Dict]) -> Tuple[List[float], List[float]]:
+    """Sorted start/end arrays for bisecting into the transcript."""
+    starts = [float(seg.get("start", 0)) for seg in segments]
+    ends = [float(seg.get("end", st)) for seg, st in zip(segments, starts)]
+    return starts, ends
+
+
+def _slice_text(
+    segments: List[Dict], starts: List[float], ends: List[float], start_s: int, end_s: int
+) -> str:
+    # first segment ending at/after start_s .. last segment starting at/before end_s
+    i0 = bisect.bisect_left(ends, start_s)
+    i1 = bisect.bisect_right(starts, end_s)
+    text = " ".join(seg.get("text", "").strip() for seg in segments[i0:i1]).strip()
     return (text[:180] + "…") if len(text) > 180 else text
 
 
@@ -74,15 +76,20 @@ def _from_scene_cuts(scene_segments: List[Dict], cfg: CandidateConfig) -> List[D
     return out
 
 
+@lru_cache(maxsize=8)
+def _hotspot_re(patterns: Tuple[str, ...]) -> re.Pattern:
+    """All hotspot patterns fused into one alternation (one scan per segment)."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
 def _from_transcript_hotspots(segments: List[Dict], cfg: CandidateConfig) -> List[Dict]:
     """Find moments with exclamations or keywords; create a padded window."""
+    hotspot_re = _hotspot_re(cfg.hotspot_keywords) if cfg.hotspot_keywords else None
     text_events: List[int] = []
     for seg in segments:
-        t = (seg.get("text") or "").lower()
+        t = seg.get("text") or ""
         st = int(seg.get("start", 0))
-        has_mark = t.count("!") >= 1
-        has_kw = any(re.search(p, t) for p in cfg.hotspot_keywords)
-        if has_mark or has_kw:
+        if "!" in t or (hotspot_re is not None and hotspot_re.search(t)):
             # Avoid events too close to each other
             if not text_events or (st - text_events[-1] >= cfg.hotspot_min_gap_s):
                 text_events.append(st)
@@ -96,27 +103,18 @@ def _from_transcript_hotspots(segments: List[Dict], cfg: CandidateConfig) -> Lis
     return out
 
 
-def _audio_energy_series(media_path: str, win_ms: int) -> List[Tuple[int, float]]:
-    audio = AudioSegment.from_file(media_path).set_channels(1)
-    out: List[Tuple[int, float]] = []
-    for i in range(0, len(audio), win_ms):
-        frame = audio[i:i + win_ms]
-        sec = i // 1000
-        out.append((int(sec), frame.rms if frame.rms > 0 else 1))
-    # convert to pseudo-dB for stability
-    return [(t, 20 * math.log10(v)) for (t, v) in out]
-
-
 def _from_audio_peaks(media_path: str, cfg: CandidateConfig) -> List[Dict]:
-    if not HAVE_PYDUB or not os.path.exists(media_path):
+    if not HAVE_FFMPEG or not os.path.exists(media_path):
         return []
-    series = _audio_energy_series(media_path, cfg.audio_win_ms)
-    if not series:
+    secs, db = audio_energy_series(media_path, cfg.audio_win_ms)
+    if db.size == 0 or cfg.audio_topk <= 0:
         return []
-    # pick top-K loud seconds
-    top = sorted(series, key=lambda x: x[1], reverse=True)[: cfg.audio_topk]
+    # pick top-K loud windows: O(N) partition, then sort only those K (loudest first)
+    k = min(cfg.audio_topk, db.size)
+    top = np.argpartition(-db, k - 1)[:k]
+    top = top[np.argsort(-db[top])]
     out = []
-    for sec, _db in top:
+    for sec in secs[top].tolist():
         s = max(0, sec - cfg.audio_pad_s)
         e = sec + cfg.audio_pad_s
         s, e = _clamp_window(s, e, cfg)
@@ -171,8 +169,9 @@ def make_candidates(
     fused = _dedupe_merge(fused, cfg)
 
     # add text previews
+    starts, ends = _segment_bounds(segs)
     for c in fused:
-        c["text_preview"] = _slice_text(segs, c["start"], c["end"])
+        c["text_preview"] = _slice_text(segs, starts, ends, c["start"], c["end"])
 
     # cap total to keep scoring/LLM prompt small
     return fused[: cfg.max_candidates]
@@ -3,6 +3,8 @@ import uuid
 import os
 from typing import Dict, Any
 
+from app.settings import S
+
 
 def render_clip(media_path: str, transcript_text: str, seg: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -30,24 +32,32 @@ def render_clip(media_path: str, transcript_text: str, seg: Dict[str, Any]) -> D
     out_path = f"tmp/{clip_id}.mp4"
     os.makedirs("tmp", exist_ok=True)
 
-    # ffmpeg trim + normalize + scale for Shorts
-    vf = "loudnorm,scale=1080:-2, crop=1080:1920"
+    # ffmpeg: input-side fast seek (-ss before -i) + duration, so long sources
+    # aren't decoded from the start; then scale/crop for Shorts + loudness normalize
+    if S.render_nvenc:
+        vcodec = ["-c:v", "h264_nvenc", "-preset", "p4"]
+    else:
+        vcodec = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "21"]
 
     cmd = [
         "ffmpeg", "-y",
         "-ss", str(start),
-        "-to", str(end),
         "-i", media_path,
-        "-vf", vf,
-        "-c:v", "libx264", "-preset", "veryfast", "-crf", "21",
+        "-t", str(dur),
+        "-avoid_negative_ts", "1",
+        "-vf", "scale=1080:-2,crop=1080:1920",
+        "-af", "loudnorm=I=-16:TP=-1.5:LRA=11",
+        *vcodec,
         "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart",
         out_path
     ]
 
     try:
-        subprocess.check_call(cmd)
+        subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
     except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"ffmpeg failed: {e}")
+        stderr = (e.stderr or b"").decode("utf-8", "replace")[-2000:]
+        raise RuntimeError(f"ffmpeg failed: {e}\n{stderr}")
 
     return {
         "clip_id": clip_id,
@@ -1,50 +1,82 @@
-import httpx, re, subprocess
+import httpx, re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from yt_dlp import YoutubeDL
 from app.services.intake.allowlist_manager import iter_enabled_creators
-from app.settings import Settings as S
+from app.services.intake.seen_log import SeenLog
+from app.settings import S
 
 STATE_DIR = Path("tmp/state"); STATE_DIR.mkdir(parents=True, exist_ok=True)
 SEEN_FILE = STATE_DIR / "seen_videos.txt"
+MEDIA_DIR = Path("tmp/media")
+YT_API = "https://www.googleapis.com/youtube/v3"
 
-def _mark_seen(video_id: str): SEEN_FILE.write_text((SEEN_FILE.read_text() if SEEN_FILE.exists() else "") + video_id + "\n", encoding="utf-8")
-def _already_seen(video_id: str) -> bool: return SEEN_FILE.exists() and video_id in SEEN_FILE.read_text(encoding="utf-8").splitlines()
+# Shared client: keeps TLS sessions alive and multiplexes requests over HTTP/2
+_YT = httpx.Client(http2=True, timeout=20)
 
+# One in-process downloader per worker instead of spawning the yt-dlp CLI per video
+_YDL = YoutubeDL({"format": "mp4", "outtmpl": str(MEDIA_DIR / "%(id)s.%(ext)s"), "quiet": True, "noprogress": True})
+
+# In-memory per process, caught up from the file's new tail (under flock) on every poll,
+# so prefork children and poll_creators/auto_pipeline never hand out the same id twice.
+_SEEN = SeenLog(SEEN_FILE)
+
+@lru_cache(maxsize=1024)  # handles → channel ids are stable
 def resolve_channel_id(url_or_handle: str) -> str:
     if "/channel/" in url_or_handle:
         m = re.search(r"/channel/([A-Za-z0-9_-]{10,})", url_or_handle); return m.group(1) if m else url_or_handle
     handle = url_or_handle.rsplit("/", 1)[-1].lstrip("@")
-    r = httpx.get("https://www.googleapis.com/youtube/v3/search",
-                  params={"part":"snippet","q":handle,"type":"channel","key":S.YT_API_KEY,"maxResults":1}, timeout=20)
+    r = _YT.get(f"{YT_API}/search",
+                params={"part":"snippet","q":handle,"type":"channel","key":S.yt_api_key,"maxResults":1})
     r.raise_for_status(); items = r.json().get("items", [])
     if not items: raise RuntimeError(f"Channel not found for {handle}")
     return items[0]["snippet"]["channelId"]
 
+def get_uploads_playlist_ids(channel_ids: list[str]) -> dict[str, str]:
+    """channel id → uploads playlist id; channels.list takes up to 50 ids per call."""
+    out: dict[str, str] = {}
+    ids = list(dict.fromkeys(channel_ids))
+    for i in range(0, len(ids), 50):
+        r = _YT.get(f"{YT_API}/channels",
+                    params={"part":"contentDetails","id":",".join(ids[i:i + 50]),"maxResults":50,"key":S.yt_api_key})
+        r.raise_for_status()
+        for it in r.json().get("items", []):
+            out[it["id"]] = it["contentDetails"]["relatedPlaylists"]["uploads"]
+    return out
+
 def get_uploads_playlist_id(channel_id: str) -> str:
-    r = httpx.get("https://www.googleapis.com/youtube/v3/channels",
-                  params={"part":"contentDetails","id":channel_id,"key":S.YT_API_KEY}, timeout=20)
-    r.raise_for_status(); items = r.json().get("items", [])
-    return items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    return get_uploads_playlist_ids([channel_id])[channel_id]
 
 def playlist_items(playlist_id: str, max_results: int = 10) -> list[dict]:
-    r = httpx.get("https://www.googleapis.com/youtube/v3/playlistItems",
-                  params={"part":"contentDetails","playlistId":playlist_id,"maxResults":max_results,"key":S.YT_API_KEY}, timeout=20)
+    r = _YT.get(f"{YT_API}/playlistItems",
+                params={"part":"contentDetails","playlistId":playlist_id,"maxResults":max_results,
+                        "fields":"items/contentDetails/videoId","key":S.yt_api_key})
     r.raise_for_status(); return r.json().get("items", [])
 
-def list_new_videos() -> list[str]:
+# playlistItems.list takes a single playlist, so fan the per-creator calls out over the shared HTTP/2 client
+_PLAYLIST_WORKERS = 8
+
+def list_new_videos(mark_seen: bool = True) -> list[str]:
+    """Unseen upload ids of the enabled YouTube creators; `mark_seen=False` only peeks."""
     out = []
-    for c in iter_enabled_creators():
-        if c.get("platform") != "youtube": continue
-        ch = resolve_channel_id(c["source_url"])
-        upl = get_uploads_playlist_id(ch)
-        for it in playlist_items(upl, max_results=5):
-            vid = it["contentDetails"]["videoId"]
-            if not _already_seen(vid):
-                _mark_seen(vid); out.append(vid)
+    channels = [resolve_channel_id(c["source_url"]) for c in iter_enabled_creators() if c.get("platform") == "youtube"]
+    uploads = get_uploads_playlist_ids(channels)
+    playlists = [uploads[ch] for ch in dict.fromkeys(channels) if uploads.get(ch)]
+    with ThreadPoolExecutor(max_workers=_PLAYLIST_WORKERS) as pool:
+        pages = list(pool.map(lambda pl: playlist_items(pl, max_results=5), playlists))
+    with _SEEN.batch() as seen:  # one lock + append handle per poll cycle
+        for items in pages:
+            for it in items:
+                vid = it["contentDetails"]["videoId"]
+                if vid not in seen and vid not in out:
+                    if mark_seen: seen.add(vid)
+                    out.append(vid)
     return out
 
 def fetch_video_media(video_id: str) -> str:
-    Path("tmp/media").mkdir(parents=True, exist_ok=True)
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
     out = f"tmp/media/{video_id}.mp4"
     if not Path(out).exists():
-        subprocess.check_call(["yt-dlp","-f","mp4","-o",out,f"https://youtu.be/{video_id}"])
+        if _YDL.download([f"https://youtu.be/{video_id}"]) != 0: raise RuntimeError(f"yt-dlp failed for {video_id}")
     return out
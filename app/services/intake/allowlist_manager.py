@@ -1,15 +1,31 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Iterator
-import yaml
+from typing import List, Dict, Any, Iterator, Tuple
+import copy
 import os
 
+import yaml
+
+# libyaml-backed loader when available (much faster than the pure-Python one)
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# path -> ((mtime_ns, size), creators); re-parsed only when the file changes.
+# Size catches edits within one mtime tick on coarse-grained filesystems.
+_CACHE: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+
 
 def load_allowlist(path: str = "config/allowlist.yaml") -> List[Dict[str, Any]]:
-    if not os.path.exists(path):
+    """Creators from the allowlist; a fresh copy each call, so callers may mutate it."""
+    try:
+        st = os.stat(path)
+    except OSError:
         return []
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    return data.get("creators", [])
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "rb") as f:
+            data = yaml.load(f, Loader=_Loader) or {}
+        cached = _CACHE[path] = (stamp, data.get("creators", []))
+    return copy.deepcopy(cached[1])
 
 
 def get_enabled_creators(path: str = "config/allowlist.yaml") -> List[Dict[str, Any]]:
@@ -9,6 +9,9 @@ import os
 
 import yaml
 import httpx
+from xxhash import xxh128
+
+from app.services.intake.seen_log import SeenLog
 
 SEEN_PATH = Path("tmp/state/campaign_seen.txt")
 INBOX_PATH = Path("tmp/state/campaign_inbox.json")
@@ -27,8 +30,15 @@ class Campaign:
     raw: Dict[str, Any]      # original for traceability
 
     def key(self) -> str:
-        base = f"{self.platform}|{self.creator_handle}|{self.source_url}"
-        return hashlib.sha1(base.encode("utf-8")).hexdigest()
+        # Dedupe key only (not security-sensitive); "v2:" marks the xxh128 scheme
+        return "v2:" + xxh128(self._key_base().encode("utf-8")).hexdigest()
+
+    def legacy_key(self) -> str:
+        """Pre-v2 SHA1 key, still present in older campaign_seen.txt files."""
+        return hashlib.sha1(self._key_base().encode("utf-8")).hexdigest()
+
+    def _key_base(self) -> str:
+        return f"{self.platform}|{self.creator_handle}|{self.source_url}"
 
 
 # ---------- Providers ----------
@@ -38,15 +48,8 @@ def _load_yaml(path: Path) -> Dict[str, Any]:
         return {}
     return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
 
-def _append_seen(key: str) -> None:
-    SEEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with SEEN_PATH.open("a", encoding="utf-8") as f:
-        f.write(key + "\n")
-
-def _already_seen(key: str) -> bool:
-    if not SEEN_PATH.exists():
-        return False
-    return key in SEEN_PATH.read_text(encoding="utf-8").splitlines()
+# Shared with other worker processes: each batch catches up on the file's new tail
+_SEEN = SeenLog(SEEN_PATH)
 
 def _validate_campaign(d: Dict[str, Any]) -> Optional[str]:
     required = ["creator_handle", "platform", "source_url"]
@@ -150,26 +153,30 @@ def propose_allowlist_updates(auto_merge: bool = False) -> Dict[str, Any]:
     campaigns = discover_campaigns()
     proposals: List[Dict[str, Any]] = []
 
-    for c in campaigns:
-        key = c.key()
-        if _already_seen(key):
-            continue
-
-        # Build a proposed allowlist entry (disabled by default)
-        entry = {
-            "handle": c.creator_handle,
-            "platform": c.platform,
-            "source_url": c.source_url,
-            "license_type": c.terms.get("license_type", "campaign"),
-            "post_channel_id": c.posting.get("post_channel_id", ""),
-            "brand_preset": c.terms.get("brand_preset", "default"),
-            "max_daily": c.posting.get("max_daily", 4),
-            "shorts_only": c.posting.get("shorts_only", True),
-            "enabled": False,  # require manual flip to True
-            "_discovered_via": c.raw,  # keep raw for context/audit
-        }
-        proposals.append(entry)
-        _append_seen(key)
+    with _SEEN.batch() as seen:
+        for c in campaigns:
+            key = c.key()
+            if key in seen:
+                continue
+            if c.legacy_key() in seen:
+                seen.add(key)  # migrate: record the v2 key once, then skip
+                continue
+
+            # Build a proposed allowlist entry (disabled by default)
+            entry = {
+                "handle": c.creator_handle,
+                "platform": c.platform,
+                "source_url": c.source_url,
+                "license_type": c.terms.get("license_type", "campaign"),
+                "post_channel_id": c.posting.get("post_channel_id", ""),
+                "brand_preset": c.terms.get("brand_preset", "default"),
+                "max_daily": c.posting.get("max_daily", 4),
+                "shorts_only": c.posting.get("shorts_only", True),
+                "enabled": False,  # require manual flip to True
+                "_discovered_via": c.raw,  # keep raw for context/audit
+            }
+            proposals.append(entry)
+            seen.add(key)
 
     # Save proposals for review
     _save_inbox(proposals)
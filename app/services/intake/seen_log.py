@@ -0,0 +1,67 @@
+"""
+Append-only "seen id" files under tmp/state, shared by every worker process.
+
+Each process keeps the ids in memory and, on every batch, reads only the bytes
+other processes appended since its last look (tracked by byte offset). The
+check-and-mark runs under an flock on a sidecar file, so two prefork children
+polling at the same time can't both claim the same id.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+import fcntl
+import os
+
+
+class SeenLog:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock_path = path.with_suffix(".lock")
+        self._ids: set[str] = set()
+        self._offset = 0
+        self._ino: int | None = None
+        self._fh = None
+
+    def _catch_up(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._ids.clear(); self._offset = 0; self._ino = None
+            return
+        if st.st_ino != self._ino or st.st_size < self._offset:  # replaced or truncated: re-read
+            self._ids.clear(); self._offset = 0; self._ino = st.st_ino
+        if st.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read()
+        end = tail.rfind(b"\n") + 1  # leave a torn last line for the next look
+        self._ids.update(tail[:end].decode("utf-8").splitlines())
+        self._offset += end
+
+    @contextmanager
+    def batch(self) -> Iterator["SeenLog"]:
+        """Lock the file, catch up on other processes' appends, and yield self for `in` / add()."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                with self.path.open("ab") as fh:
+                    self._fh = fh
+                    try:
+                        yield self
+                    finally:
+                        self._fh = None
+                        self._ino = os.fstat(fh.fileno()).st_ino
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def add(self, key: str) -> None:
+        """Record `key`; only valid inside batch(). (Our own lines are re-read, harmlessly, on the next catch-up.)"""
+        self._fh.write((key + "\n").encode("utf-8"))
+        self._ids.add(key)
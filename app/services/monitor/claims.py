@@ -1,14 +1,100 @@
-import time
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import logging
 
+import httplib2
+import requests
+from googleapiclient.errors import HttpError
 
-def check_claim_then_publish(video_id: str):
+from app.services.publisher.quota import QuotaExhausted
+from app.services.publisher.youtube_upload import set_privacy, yt_client
+from app.settings import S
+
+log = logging.getLogger(__name__)
+
+# Claim-check polling: 5 → 10 → 20 → 40 → 60 → 60 min, then give up
+CLAIM_CHECK_BASE_S = 300
+CLAIM_CHECK_MAX_S = 3600
+CLAIM_CHECK_MAX_ATTEMPTS = 6
+
+# Outcomes that are worth checking again later; anything else is final
+RETRY_STATUSES = ("pending", "check_failed", "publish_failed")
+# Final outcome for a clip still unresolved after CLAIM_CHECK_MAX_ATTEMPTS checks
+GAVE_UP = "unresolved"
+
+# No-DB mode: one JSON line per final outcome
+OUTCOMES_FILE = Path("tmp/state/claim_outcomes.jsonl")
+
+
+def next_check_delay(attempt: int) -> int:
+    """Seconds to wait before claim check number `attempt` (0-based)."""
+    return min(CLAIM_CHECK_BASE_S * 2 ** attempt, CLAIM_CHECK_MAX_S)
+
+
+def claim_status(video_id: str) -> str:
+    """
+    One videos.list call (partial response, 1 quota unit).
+    Returns "pending" (still uploading/processing), "claimed" (rejected),
+    "failed" (processing failed or the video was deleted), "clean", or "missing".
+    """
+    resp = yt_client().videos().list(
+        part="status",
+        id=video_id,
+        fields="items/status(uploadStatus,rejectionReason)",
+    ).execute()
+    items = resp.get("items", [])
+    if not items:
+        return "missing"
+    status = items[0].get("status", {})
+    upload_status = status.get("uploadStatus")
+    if upload_status == "rejected":
+        return "claimed"
+    if upload_status in ("failed", "deleted"):
+        return "failed"
+    if upload_status != "processed":
+        return "pending"
+    return "clean"
+
+
+def check_claim_then_publish(video_id: str) -> dict:
+    """
+    Check claim status once; flip the video to public as soon as it's clean.
+    A status lookup that errors reports "check_failed", and a flip that fails
+    (HTTP error or local quota) "publish_failed"; the Celery task wrapper
+    re-schedules both with the same backoff as "pending" (see RETRY_STATUSES).
+    """
+    try:
+        status = claim_status(video_id)
+    except (HttpError, httplib2.HttpLib2Error, OSError) as e:
+        log.warning("[claims] status check failed for %s: %s", video_id, e)
+        return {"video_id": video_id, "status": "check_failed"}
+    if status == "clean":
+        try:
+            set_privacy(video_id, "public")
+        except (requests.RequestException, QuotaExhausted) as e:
+            log.warning("[claims] public flip failed for %s: %s", video_id, e)
+            status = "publish_failed"
+    return {"video_id": video_id, "status": status}
+
+
+def record_outcome(video_id: str, status: str) -> None:
     """
-    Placeholder: In production, poll YouTube API for claim status and flip to public.
-    Here we just sleep a bit to simulate delay and return a result structure.
+    Remember how a clip's claim check ended: Clip.claim_status when Postgres is
+    configured, else a line in tmp/state/claim_outcomes.jsonl.
     """
-    time.sleep(1)
-    return {"video_id": video_id, "status": "clean"}
-def check_claim_then_publish(upload_id:str):
-    # poll video.get → contentDetails/contentRating/monetizationDetails/claims (some via CMS if available)
-    # naive: if no claim detected after 30–60 min → set privacyStatus=public
-    pass
+    if S.postgres_url:
+        from sqlalchemy import select, update
+        from app.db import Session
+        from app.models import Clip, Upload
+        with Session() as session:
+            session.execute(
+                update(Clip)
+                .where(Clip.id.in_(select(Upload.clip_id).where(Upload.remote_video_id == video_id)))
+                .values(claim_status=status)
+            )
+        return
+    OUTCOMES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    line = {"video_id": video_id, "status": status, "at": datetime.now(timezone.utc).isoformat()}
+    with OUTCOMES_FILE.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
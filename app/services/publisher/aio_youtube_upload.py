@@ -0,0 +1,181 @@
+"""
+Async YouTube upload path: many clips on one event loop.
+
+Speaks the raw resumable protocol over a single pooled aiohttp session per loop
+and streams each file in chunks read with aiofiles, so N concurrent uploads
+cost ~N * chunk of memory and no thread per upload. Chunk sizing, backoff,
+quota bookkeeping, metadata and OAuth credentials are shared with the sync
+path in youtube_upload.
+"""
+import asyncio
+import logging
+import time
+
+import aiofiles
+import aiohttp
+import orjson
+
+from app.services.publisher import quota
+from app.services.publisher.youtube_upload import (
+    MAX_CHUNK_RETRIES,
+    RETRYABLE_STATUS,
+    UPLOAD_URL,
+    _INSERT_PARAMS,
+    _JSON_HEADERS,
+    _backoff_delay,
+    _checked_stat,
+    _chunk_size,
+    _committed,
+    _credentials,
+    _ensure_fresh,
+    _next_chunk_size,
+    _quota_account,
+    _quota_refused,
+    _video_body,
+)
+
+log = logging.getLogger(__name__)
+
+CONNECTION_LIMIT = 16
+DEFAULT_CONCURRENCY = 8
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _close_stale(old: aiohttp.ClientSession, old_loop: asyncio.AbstractEventLoop) -> None:
+    """Close a session left behind on another event loop (sessions can't cross loops)."""
+    if old_loop.is_closed():
+        # e.g. a finished asyncio.run(): no coroutine can run on that loop any more, so
+        # close the connector synchronously (aiohttp skips transport teardown once its
+        # loop is closed and just marks it closed)
+        if old.connector is not None:
+            old.connector._close()
+    else:
+        # still alive (another thread, or idle): close it on its own loop
+        asyncio.run_coroutine_threadsafe(old.close(), old_loop)
+
+
+def session() -> aiohttp.ClientSession:
+    """The module's pooled session, (re)created for the running loop."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None and not _session.closed:
+            _close_stale(_session, _session_loop)
+        _session_loop = loop
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, keepalive_timeout=75),
+        )
+    return _session
+
+
+async def close() -> None:
+    """Close the pooled session (call before the loop shuts down)."""
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+def _auth(creds) -> dict:
+    # the token is kept fresh by youtube_upload's background refresher, so read it per
+    # request; lock-free, so a refresh in flight never stalls the event loop
+    return {"Authorization": f"Bearer {creds.token}"}
+
+
+async def upload_short(clip: dict, visibility: str = "unlisted", *, sem: asyncio.Semaphore | None = None) -> dict:
+    """
+    Same contract as youtube_upload.upload_short: POST the metadata for a session
+    URI, then PUT adaptive 256 KiB-aligned chunks, retrying 429/5xx and connection
+    errors with jittered backoff from the server's committed offset.
+    `sem` bounds how many uploads run at once.
+    """
+    http = session()
+    path = clip["path"]
+    size = _checked_stat(path).st_size
+    account = _quota_account()
+    async with sem or asyncio.Semaphore(1):
+        await asyncio.to_thread(quota.reserve, account)
+        creds = await asyncio.to_thread(_credentials)  # takes the refresh lock
+        await asyncio.to_thread(_ensure_fresh, creds)
+        async with http.post(
+            UPLOAD_URL,
+            params={**_INSERT_PARAMS, "uploadType": "resumable"},
+            data=orjson.dumps(_video_body(clip, visibility)),
+            headers={**_auth(creds), **_JSON_HEADERS, "X-Upload-Content-Type": "video/mp4", "X-Upload-Content-Length": str(size)},
+        ) as r:
+            if _quota_refused(r.status, await r.text()):
+                await asyncio.to_thread(quota.block, account)
+                raise quota.QuotaExhausted(f"videos.insert refused ({r.status}) for {account}")
+            r.raise_for_status()
+            location = r.headers["Location"]
+
+        async with aiofiles.open(path, "rb") as f:
+            video_id = await _put_chunks(http, creds, location, f, size)
+
+    return {
+        "video_id": video_id,
+        "url": f"https://youtu.be/{video_id}",
+    }
+
+
+async def _put_chunks(http: aiohttp.ClientSession, creds, location: str, f, size: int) -> str:
+    """Buffered read loop: one chunk-sized read per PUT; returns the video id."""
+    chunk = _chunk_size()
+    offset = retries = 0
+    while True:
+        await f.seek(offset)
+        data = await f.read(chunk)
+        t0 = time.monotonic()
+        status = None
+        try:
+            async with http.put(
+                location,
+                data=data,
+                headers={**_auth(creds), "Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{size}"},
+            ) as r:
+                status = r.status
+                if status in (200, 201):
+                    return orjson.loads(await r.read())["id"]
+                if status == 308:
+                    offset = _committed(r.headers.get("Range"))
+                    retries = 0
+                    chunk = _next_chunk_size(chunk, time.monotonic() - t0)
+                    continue
+                if status not in RETRYABLE_STATUS or retries >= MAX_CHUNK_RETRIES:
+                    r.raise_for_status()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if retries >= MAX_CHUNK_RETRIES:
+                raise
+        delay = _backoff_delay(retries)
+        retries += 1
+        log.warning("[upload] chunk retry attempt=%s status=%s sleep=%.1fs", retries, status, delay)
+        await asyncio.sleep(delay)
+        # ask the server how much of the failed chunk it kept (keep our offset if that fails too)
+        try:
+            async with http.put(location, headers={**_auth(creds), "Content-Range": f"bytes */{size}"}) as q:
+                if q.status in (200, 201):
+                    return orjson.loads(await q.read())["id"]
+                if q.status == 308:
+                    offset = _committed(q.headers.get("Range"))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            pass
+
+
+async def upload_many(clips: list[dict], visibility: str = "unlisted",
+                      concurrency: int = DEFAULT_CONCURRENCY) -> list[dict]:
+    """
+    Upload `clips` concurrently on the current loop, at most `concurrency` at a time.
+    Same result shape as youtube_upload.upload_many: in order, and a failed clip
+    yields {"error": ..., "clip": clip} instead of raising.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(upload_short(c, visibility, sem=sem) for c in clips), return_exceptions=True)
+    out: list[dict] = []
+    for clip, res in zip(clips, results):
+        if isinstance(res, BaseException):
+            if not isinstance(res, Exception):  # CancelledError etc. still propagate
+                raise res
+            log.warning("[upload] %s failed: %s", clip.get("path"), res)
+            res = {"error": str(res), "clip": clip}
+        out.append(res)
+    return out
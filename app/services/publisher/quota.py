@@ -0,0 +1,103 @@
+"""
+Local YouTube quota bookkeeping, so uploads fail fast instead of spending
+round-trips (and backoff time) on calls the API will refuse.
+
+State lives in tmp/state/quota.json:
+  {"spent": {"<account>:<Pacific date>": units, ...},
+   "blocked": {"<account>:<method>": <unix ts until which not to call>, ...}}
+Writers across worker processes are serialized with an flock on a sidecar file.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+import fcntl
+import json
+import os
+import time
+
+from app.settings import S
+
+QUOTA_FILE = Path("tmp/state/quota.json")
+LOCK_FILE = QUOTA_FILE.with_suffix(".lock")
+
+VIDEOS_INSERT = "videos.insert"
+VIDEOS_INSERT_UNITS = 1600
+VIDEOS_UPDATE = "videos.update"
+VIDEOS_UPDATE_UNITS = 50
+# after a 429 / quotaExceeded, don't call the method again for this long
+BLOCK_S = 3600
+# Data API quota resets at midnight Pacific Time, not UTC
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+
+class QuotaExhausted(RuntimeError):
+    """Raised before a call that the local quota ledger says would be refused."""
+
+    def __init__(self, msg: str, retry_after: float = BLOCK_S):
+        super().__init__(msg)
+        self.retry_after = retry_after  # seconds until the call is worth trying again
+
+
+def _seconds_to_quota_reset() -> float:
+    """Seconds until the next midnight Pacific (DST-aware: compared in UTC)."""
+    now = datetime.now(QUOTA_TZ)
+    reset = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), QUOTA_TZ)
+    return (reset.astimezone(timezone.utc) - now.astimezone(timezone.utc)).total_seconds()
+
+
+@contextmanager
+def _ledger():
+    QUOTA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                state = json.loads(QUOTA_FILE.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                state = {}
+            state.setdefault("spent", {})
+            state.setdefault("blocked", {})
+            yield state
+            tmp = QUOTA_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, QUOTA_FILE)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _day_key(account: str) -> str:
+    return f"{account}:{datetime.now(QUOTA_TZ).date().isoformat()}"
+
+
+def reserve(account: str, method: str = VIDEOS_INSERT, units: int = VIDEOS_INSERT_UNITS) -> None:
+    """
+    Charge `units` to today's budget (YT_DAILY_QUOTA) for `account`, or raise
+    QuotaExhausted if that would overrun it or `method` is in a 429 back-off window.
+    """
+    now = time.time()
+    with _ledger() as state:
+        until = state["blocked"].get(f"{account}:{method}", 0)
+        if until > now:
+            raise QuotaExhausted(
+                f"{method} throttled for {account} until {datetime.fromtimestamp(until, timezone.utc):%H:%M}Z",
+                retry_after=until - now,
+            )
+        day = _day_key(account)
+        # drop previous days' counters so the file stays tiny
+        today = day.rsplit(":", 1)[1]
+        spent = state["spent"] = {k: v for k, v in state["spent"].items() if k.endswith(today)}
+        spent.setdefault(day, 0)
+        if spent[day] + units > S.yt_daily_quota:
+            raise QuotaExhausted(
+                f"{account} has spent {spent[day]}/{S.yt_daily_quota} units today",
+                retry_after=_seconds_to_quota_reset(),
+            )
+        spent[day] += units
+
+
+def block(account: str, method: str = VIDEOS_INSERT, seconds: int = BLOCK_S) -> None:
+    """Remember a 429 / quotaExceeded so calls to `method` stop until it expires."""
+    with _ledger() as state:
+        state["blocked"] = {k: v for k, v in state["blocked"].items() if v > time.time()}
+        state["blocked"][f"{account}:{method}"] = time.time() + seconds
@@ -0,0 +1,58 @@
+"""
+Durable map of in-flight resumable upload sessions, so a worker that dies
+mid-upload resumes from the server's committed offset instead of byte 0.
+
+Keyed on (path, size, mtime): a re-rendered clip gets a fresh session.
+YouTube keeps a session URI alive for about a week; older rows are pruned.
+"""
+from pathlib import Path
+import os
+import sqlite3
+import time
+
+import xxhash
+
+DB_PATH = Path("tmp/state/resumable.sqlite")
+MAX_AGE_S = 6 * 24 * 3600
+
+
+def _connect() -> sqlite3.Connection:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)  # autocommit
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, uri TEXT NOT NULL, created REAL NOT NULL)"
+    )
+    return conn
+
+
+def job_key(path: str, st: os.stat_result) -> str:
+    return xxhash.xxh128_hexdigest(f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}")
+
+
+def get(key: str) -> str | None:
+    """Session URI saved for `key`, if it is young enough to still be valid."""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT uri FROM sessions WHERE key = ? AND created > ?", (key, time.time() - MAX_AGE_S)
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def put(key: str, uri: str) -> None:
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM sessions WHERE created <= ?", (time.time() - MAX_AGE_S,))
+        conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (key, uri, time.time()))
+    finally:
+        conn.close()
+
+
+def forget(key: str) -> None:
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+    finally:
+        conn.close()
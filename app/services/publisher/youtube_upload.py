@@ -1,18 +1,306 @@
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.model import JsonModel
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import io
+import logging
 import os
+import random
+import socket
+import threading
+import time
+import uuid
 
-# TODO: replace with real credential handling later
-API_KEY = os.getenv("YT_API_KEY")
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 
-def yt_client():
-    return build("youtube", "v3", developerKey=API_KEY)
+from app.services.publisher import quota, resumable
+from app.settings import S
+
+log = logging.getLogger(__name__)
+
+# Resumable uploads must send chunks in multiples of 256 KiB
+CHUNK_ALIGN = 256 * 1024
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_CHUNK_RETRIES = 6
+# Retry sleep: min(cap, base * 2**attempt) + uniform(0, jitter)
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 64.0
+BACKOFF_JITTER_S = 1.0
+# Adaptive chunking: grow on fast chunks, shrink on slow ones, within these bounds
+MIN_CHUNK = CHUNK_ALIGN
+MAX_CHUNK = 64 * 1024 * 1024
+FAST_CHUNK_S = 10.0
+SLOW_CHUNK_S = 30.0
+# one large sequential read per chunk instead of many small preads
+READ_BUFFER_BYTES = 8 * 1024 * 1024
+# anything smaller can't be a rendered Short; YouTube would reject it after the transfer
+MIN_SHORT_BYTES = 64 * 1024
+# clips up to this size go up in one multipart POST (no session round-trip)
+MULTIPART_MAX_BYTES = 64 * 1024 * 1024
+
+UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+UPLOAD_SCOPE = "https://www.googleapis.com/auth/youtube.upload"
+# videos.update (the public flip after the claim check) needs the full youtube scope
+MANAGE_SCOPE = "https://www.googleapis.com/auth/youtube"
+OAUTH_SCOPES = [UPLOAD_SCOPE, MANAGE_SCOPE]
+VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+UPLOAD_TIMEOUT_S = (10, 300)  # (connect, read) per request
+_JSON_HEADERS = {"Content-Type": "application/json; charset=UTF-8"}
+# videos.insert: only the id is used, so ask for nothing else back (partial response)
+_INSERT_PARAMS = {"part": "snippet,status", "fields": "id"}
+
+class _OrjsonModel(JsonModel):
+    """googleapiclient's JSON model with orjson doing the (de)serialization."""
+
+    def serialize(self, body_value):
+        if isinstance(body_value, dict) and "data" not in body_value and self._data_wrapper:
+            body_value = {"data": body_value}
+        return orjson.dumps(body_value).decode()
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+def yt_client(developer_key: str | None = None):
+    """Read-only Data API client on YT_API_KEY (or `developer_key`)."""
+    return _yt_client(developer_key or S.yt_api_key)
+
+
+@lru_cache(maxsize=4)
+def _yt_client(developer_key: str | None):
+    # Built once per process (and key) so its httplib2 connection stays warm across
+    # claim checks. Not thread-safe: share within one thread only. The discovery doc
+    # comes from the copy bundled with google-api-python-client (no network fetch).
+    return build("youtube", "v3", developerKey=developer_key, cache_discovery=False, static_discovery=True,
+                 model=_OrjsonModel())
+
+
+# Refresh the access token this long before it expires, checked every REFRESH_TICK_S
+# by a background thread, so a long upload never stalls on a blocking refresh.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+REFRESH_TICK_S = 60.0
+
+_creds = None
+_creds_lock = threading.Lock()
+
+
+def _credentials():
+    """
+    OAuth2 user credentials, loaded once per process: from the authorized-user file at
+    YT_OAUTH_FILE if present, else from the YT_CLIENT_ID/SECRET/REFRESH_TOKEN settings.
+    Starts the background refresher on first use.
+    """
+    global _creds
+    with _creds_lock:
+        if _creds is None:
+            from google.oauth2.credentials import Credentials
+            if S.yt_oauth_file and os.path.exists(S.yt_oauth_file):
+                _creds = Credentials.from_authorized_user_file(S.yt_oauth_file, OAUTH_SCOPES)
+            else:
+                _creds = Credentials(
+                    None,
+                    refresh_token=S.yt_refresh_token,
+                    token_uri=TOKEN_URI,
+                    client_id=S.yt_client_id,
+                    client_secret=S.yt_client_secret,
+                    scopes=OAUTH_SCOPES,
+                )
+            threading.Thread(target=_refresh_loop, name="yt-token-refresh", daemon=True).start()
+    return _creds
+
+
+def _ensure_fresh(creds) -> None:
+    """Refresh `creds` if it has no token yet or expires within TOKEN_REFRESH_MARGIN."""
+    from google.auth.transport.requests import Request
+    # google-auth keeps `expiry` as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with _creds_lock:
+        if creds.token is None or creds.expiry is None or creds.expiry - now < TOKEN_REFRESH_MARGIN:
+            creds.refresh(Request())
+
+
+def _refresh_loop() -> None:
+    while True:
+        try:
+            _ensure_fresh(_creds)
+        except Exception as e:
+            log.warning("[upload] token refresh failed: %s", e)
+        time.sleep(REFRESH_TICK_S)
+
+
+class _TunedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose sockets keep Nagle off. Send/receive buffers are left to the
+    kernel's autotuning (which grows them to tcp_wmem/tcp_rmem max) unless
+    YT_UPLOAD_SOCKET_BUFFER_BYTES is set: a fixed SO_SNDBUF/SO_RCVBUF turns
+    autotuning off and is capped at wmem_max/rmem_max (~208 KiB by default).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        options = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+        buf = S.yt_upload_socket_buffer_bytes
+        if buf:
+            options += [(socket.SOL_SOCKET, socket.SO_SNDBUF, buf), (socket.SOL_SOCKET, socket.SO_RCVBUF, buf)]
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def _upload_session():
+    """
+    Pooled, authorized requests session for the resumable upload endpoint. Shared by
+    every upload in the process (upload_many threads included), so TCP/TLS is reused
+    across chunks and clips; tokens refresh transparently before requests.
+    """
+    from google.auth.transport.requests import AuthorizedSession
+    session = AuthorizedSession(_credentials())
+    session.mount("https://", _TunedAdapter(pool_connections=8, pool_maxsize=32, max_retries=0))
+    return session
+
+
+def _backoff_delay(attempt: int) -> float:
+    return min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt) + random.uniform(0, BACKOFF_JITTER_S)
+
+
+def _chunk_size() -> int:
+    return max(CHUNK_ALIGN, S.yt_upload_chunk_bytes // CHUNK_ALIGN * CHUNK_ALIGN)
+
+
+def _committed(range_header: str | None) -> int:
+    """Bytes the server holds, from a 308 `Range: bytes=0-N` header."""
+    return int(range_header.rsplit("-", 1)[1]) + 1 if range_header else 0
+
+
+def _checked_stat(path: str) -> os.stat_result:
+    """stat() of the clip file; fails fast (before opening an upload session) if it can't be a Short."""
+    st = os.stat(path)
+    if st.st_size < MIN_SHORT_BYTES:
+        raise ValueError(f"{path} is {st.st_size} bytes; refusing to upload (min {MIN_SHORT_BYTES})")
+    return st
+
+
+def _quota_account() -> str:
+    return S.yt_client_id or "default"
+
+
+def _quota_refused(status: int, body: str) -> bool:
+    """429, or the 403 YouTube returns once the daily quota is gone."""
+    return status == 429 or (status == 403 and "quotaExceeded" in body)
+
+
+def _raise_if_quota_refused(account: str, r) -> None:
+    if _quota_refused(r.status_code, r.text):
+        quota.block(account)
+        raise quota.QuotaExhausted(f"videos.insert refused ({r.status_code}) for {account}")
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Worth retrying the whole upload later: connection errors, timeouts and 429/5xx.
+    4xx (bad auth/metadata) and local errors (missing file) would fail the same way again.
+    """
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _next_chunk_size(chunk: int, dt: float) -> int:
+    """Double after a fast chunk, halve after a slow one; stays 256 KiB-aligned."""
+    if dt < FAST_CHUNK_S:
+        chunk *= 2
+    elif dt > SLOW_CHUNK_S:
+        chunk //= 2
+    return min(max(chunk, MIN_CHUNK), MAX_CHUNK)
+
+
+# Constant parts of every videos.insert body; only title/description/privacy vary per clip.
+# Shared (never mutated) across bodies.
+_SNIPPET_TEMPLATE = {
+    "tags": ["shorts", "highlights", "clips"],
+    "categoryId": "24",  # Entertainment
+}
+_STATUS_TEMPLATE = {"selfDeclaredMadeForKids": False}
+_SHORTS_SUFFIX = "\n\n#shorts"
+# YouTube answers 400 past these limits, or on '<' / '>' anywhere in either field
+MAX_TITLE_CHARS = 100
+MAX_DESCRIPTION_BYTES = 5000  # UTF-8 bytes, not characters
+_NO_ANGLE_BRACKETS = str.maketrans("", "", "<>")
+
+
+def _clamp_utf8(text: str, max_bytes: int) -> str:
+    """`text` cut to at most `max_bytes` of UTF-8, at a character boundary."""
+    raw = text.encode("utf-8")
+    return text if len(raw) <= max_bytes else raw[:max_bytes].decode("utf-8", "ignore")
+
+
+def _title(clip: dict) -> str:
+    title = (clip.get("title") or "").translate(_NO_ANGLE_BRACKETS).strip()[:MAX_TITLE_CHARS]
+    return title or "Untitled Clip"
+
+
+def _clean_text(text: str, max_bytes: int) -> str:
+    return _clamp_utf8(text.translate(_NO_ANGLE_BRACKETS), max_bytes)
+
+
+def _description(clip: dict) -> str:
+    """
+    Final description, kept on the clip so retries reuse it: a caller-supplied
+    `description`, or `reason` + #shorts. Either way sanitized and clamped.
+    """
+    desc = clip.get("description")
+    if desc is None:
+        desc = _clean_text(clip.get("reason", ""), MAX_DESCRIPTION_BYTES - len(_SHORTS_SUFFIX.encode("utf-8")))
+        desc += _SHORTS_SUFFIX
+    else:
+        desc = _clean_text(desc, MAX_DESCRIPTION_BYTES)
+    clip["description"] = desc
+    return desc
+
+
+def _video_body(clip: dict, visibility: str) -> dict:
+    return {
+        "snippet": {
+            **_SNIPPET_TEMPLATE,
+            "title": _title(clip),
+            "description": _description(clip),
+        },
+        "status": {**_STATUS_TEMPLATE, "privacyStatus": visibility},
+    }
 
 
 def upload_short(clip: dict, visibility: str = "unlisted") -> dict:
     """
     Upload a rendered clip to YouTube.
 
+    Talks to the resumable upload endpoint directly over a pooled requests session:
+    one POST with the metadata opens the upload session, then the file is PUT in
+    chunks starting at YT_UPLOAD_CHUNK_BYTES (default 8 MiB) and adapting to the
+    uplink: chunks under 10 s double, over 30 s halve (256 KiB..64 MiB). Only one
+    chunk is held in memory. A chunk that fails with 429/5xx or a connection error
+    is retried with jittered exponential backoff (up to 6 times) and resumes from
+    the offset the server reports.
+
+    Shorts-sized files (<= 64 MiB, the common case) skip all that and go up in a
+    single multipart POST, retried whole on the same transient errors.
+
+    The session URI is persisted (publisher.resumable) until the upload finishes,
+    so a retry after a crash asks the server for its offset and resumes there.
+    Every new session or multipart POST is charged against a local daily quota ledger first (see
+    publisher.quota); QuotaExhausted is raised without touching the network when
+    the budget is spent or the API recently answered 429 / quotaExceeded.
+
     Args:
         clip: dict with {path, title, reason, ...}
         visibility: "unlisted" (default), "public", or "private"
@@ -20,32 +308,246 @@ def upload_short(clip: dict, visibility: str = "unlisted") -> dict:
     Returns:
         dict with {"video_id": "...", "url": "..."}
     """
-    yt = yt_client()
+    path = clip["path"]
+    st = _checked_stat(path)
+    size = st.st_size
+    http = _upload_session()
 
-    body = {
-        "snippet": {
-            "title": clip.get("title", "Untitled Clip"),
-            "description": clip.get("reason", "") + "\n\n#shorts",
-            "tags": ["shorts", "highlights", "clips"],
-            "categoryId": "24",  # Entertainment
-        },
-        "status": {
-            "privacyStatus": visibility,
-            "selfDeclaredMadeForKids": False,
-        },
-    }
+    if size <= MULTIPART_MAX_BYTES:
+        response = _upload_multipart(http, clip, visibility, path)
+        video_id = response["id"]
+        return {
+            "video_id": video_id,
+            "url": f"https://youtu.be/{video_id}",
+        }
 
-    media = MediaFileUpload(clip["path"], chunksize=-1, resumable=True)
+    key = resumable.job_key(path, st)
+    # Resume a session a previous (crashed) attempt left behind, if it's still alive
+    location = resumable.get(key)
+    offset, response = 0, None
+    if location:
+        try:
+            offset, response = _session_status(http, location, size)
+        except requests.RequestException as e:  # 404/410 once the session expired
+            log.info("[upload] saved session for %s unusable (%s); starting over", path, e)
+            resumable.forget(key)
+            location = None
 
-    request = yt.videos().insert(
-        part="snippet,status",
-        body=body,
-        media_body=media,
-    )
-    response = request.execute()
+    if location is None:
+        account = _quota_account()
+        quota.reserve(account)  # raises QuotaExhausted before any network I/O
+        r = http.post(
+            UPLOAD_URL,
+            params={**_INSERT_PARAMS, "uploadType": "resumable"},
+            data=orjson.dumps(_video_body(clip, visibility)),
+            headers={**_JSON_HEADERS, "X-Upload-Content-Type": "video/mp4", "X-Upload-Content-Length": str(size)},
+            timeout=UPLOAD_TIMEOUT_S,
+        )
+        _raise_if_quota_refused(account, r)
+        r.raise_for_status()
+        location = r.headers["Location"]
+        resumable.put(key, location)
+
+    if response is None:
+        # one large sequential read per chunk instead of many small preads
+        with open(path, "rb", buffering=READ_BUFFER_BYTES) as fh:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)  # deeper kernel readahead
+            response = _put_chunks(http, location, fh, size, offset)
+    resumable.forget(key)
 
     video_id = response["id"]
     return {
         "video_id": video_id,
         "url": f"https://youtu.be/{video_id}",
     }
+
+
+class _MultipartBody:
+    """
+    multipart/related body (JSON part, file part) streamed from disk, so a 64 MiB
+    clip never sits in memory. Has a length (requests sends Content-Length, not
+    chunked encoding) and rewind() for retries.
+    """
+
+    def __init__(self, head: bytes, path: str, tail: bytes):
+        self._head, self._tail = head, tail
+        self._fh = open(path, "rb", buffering=READ_BUFFER_BYTES)
+        self._len = len(head) + os.fstat(self._fh.fileno()).st_size + len(tail)
+        self.rewind()
+
+    def rewind(self) -> None:
+        self._fh.seek(0)
+        self._parts = [io.BytesIO(self._head), self._fh, io.BytesIO(self._tail)]
+        self._part = 0
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            return b"".join(iter(lambda: self.read(READ_BUFFER_BYTES), b""))
+        while self._part < len(self._parts):
+            data = self._parts[self._part].read(n)
+            if data:
+                return data
+            self._part += 1
+        return b""
+
+    def __iter__(self):
+        return iter(lambda: self.read(READ_BUFFER_BYTES), b"")
+
+    def __len__(self) -> int:
+        return self._len
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _upload_multipart(http, clip: dict, visibility: str, path: str) -> dict:
+    """videos.insert as one multipart/related POST (metadata + bytes); returns the video resource."""
+    account = _quota_account()
+    quota.reserve(account)
+    boundary = uuid.uuid4().hex
+    head = b"".join((
+        f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n".encode(),
+        orjson.dumps(_video_body(clip, visibility)),
+        f"\r\n--{boundary}\r\nContent-Type: video/mp4\r\n\r\n".encode(),
+    ))
+    headers = {"Content-Type": f"multipart/related; boundary={boundary}"}
+    retries = 0
+    with _MultipartBody(head, path, f"\r\n--{boundary}--".encode()) as payload:
+        while True:
+            status = None
+            payload.rewind()
+            try:
+                r = http.post(UPLOAD_URL, params={**_INSERT_PARAMS, "uploadType": "multipart"},
+                              data=payload, headers=headers, timeout=UPLOAD_TIMEOUT_S)
+                status = r.status_code
+                if status in (200, 201):
+                    return orjson.loads(r.content)
+                _raise_if_quota_refused(account, r)
+                if status not in RETRYABLE_STATUS or retries >= MAX_CHUNK_RETRIES:
+                    r.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout):
+                if retries >= MAX_CHUNK_RETRIES:
+                    raise
+            delay = _backoff_delay(retries)
+            retries += 1
+            log.warning("[upload] multipart retry attempt=%s status=%s sleep=%.1fs", retries, status, delay)
+            time.sleep(delay)
+
+
+def _session_status(http, location: str, size: int) -> tuple[int, dict | None]:
+    """Ask an upload session where it stands: (committed bytes, None) or (size, video resource) if done."""
+    q = http.put(location, headers={"Content-Range": f"bytes */{size}"},
+                 timeout=UPLOAD_TIMEOUT_S, allow_redirects=False)
+    if q.status_code in (200, 201):
+        return size, orjson.loads(q.content)
+    if q.status_code != 308:
+        q.raise_for_status()
+    return _committed(q.headers.get("Range")), None
+
+
+def _read_at(fh, offset: int, n: int) -> bytes:
+    fh.seek(offset)
+    return fh.read(n)
+
+
+def _put_chunks(http, location: str, fh, size: int, offset: int = 0) -> dict:
+    """
+    PUT `fh` from `offset` to the upload session with adaptive sizing and backoff;
+    returns the video resource. The next chunk is read on a helper thread while the
+    current one is on the wire (double buffering); only one thread touches `fh` at a time.
+    """
+    chunk = _chunk_size()
+    retries = 0
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        ahead = None  # (offset, future) of the prefetched chunk
+        while True:
+            if ahead is not None and ahead[0] == offset:
+                data = ahead[1].result()
+            else:
+                if ahead is not None:
+                    ahead[1].result()  # server rewound us; let the stale read finish first
+                data = _read_at(fh, offset, chunk)
+            ahead = None
+            # the chunk size may have changed since the prefetch was issued
+            if len(data) > chunk:
+                data = data[:chunk]
+            elif len(data) < chunk and offset + len(data) < size:
+                data += _read_at(fh, offset + len(data), chunk - len(data))
+            if offset + len(data) < size:
+                ahead = (offset + len(data), reader.submit(_read_at, fh, offset + len(data), chunk))
+            t0 = time.monotonic()
+            status = None
+            try:
+                r = http.put(
+                    location,
+                    data=data,
+                    headers={"Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{size}"},
+                    timeout=UPLOAD_TIMEOUT_S,
+                    allow_redirects=False,  # 308 means "resume incomplete" here, not a redirect
+                )
+                status = r.status_code
+                if status in (200, 201):
+                    return orjson.loads(r.content)
+                if status == 308:
+                    offset = _committed(r.headers.get("Range"))
+                    retries = 0
+                    chunk = _next_chunk_size(chunk, time.monotonic() - t0)
+                    continue
+                if status not in RETRYABLE_STATUS or retries >= MAX_CHUNK_RETRIES:
+                    r.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout):
+                if retries >= MAX_CHUNK_RETRIES:
+                    raise
+            delay = _backoff_delay(retries)
+            retries += 1
+            log.warning("[upload] chunk retry attempt=%s status=%s sleep=%.1fs", retries, status, delay)
+            time.sleep(delay)
+            # ask the server how much of the failed chunk it kept (keep our offset if that fails too)
+            try:
+                offset, done = _session_status(http, location, size)
+            except requests.RequestException:
+                continue
+            if done is not None:
+                return done
+
+
+def set_privacy(video_id: str, visibility: str) -> None:
+    """
+    videos.update on the status part, over the OAuth session: the API-key client
+    (yt_client) can only read, writes need the uploader's credentials.
+    """
+    quota.reserve(_quota_account(), quota.VIDEOS_UPDATE, quota.VIDEOS_UPDATE_UNITS)
+    r = _upload_session().put(
+        VIDEOS_URL,
+        params={"part": "status", "fields": "id"},
+        data=orjson.dumps({"id": video_id, "status": {**_STATUS_TEMPLATE, "privacyStatus": visibility}}),
+        headers=_JSON_HEADERS,
+        timeout=UPLOAD_TIMEOUT_S,
+    )
+    r.raise_for_status()
+
+
+def upload_many(clips: list[dict], visibility: str = "unlisted", max_concurrency: int | None = None) -> list[dict]:
+    """
+    Upload several clips in parallel on a bounded thread pool (YT_UPLOAD_CONCURRENCY,
+    default 4; per-user quotas make more counter-productive). Results keep the order
+    of `clips`; a failed clip yields {"error": ..., "clip": clip} instead of raising.
+    """
+    results: list[dict] = [{} for _ in clips]
+    with ThreadPoolExecutor(max_workers=max_concurrency or S.yt_upload_concurrency) as pool:
+        futures = {pool.submit(upload_short, clip, visibility): i for i, clip in enumerate(clips)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                log.warning("[upload] %s failed: %s", clips[i].get("path"), e)
+                results[i] = {"error": str(e), "clip": clips[i]}
+    return results
@@ -1,5 +1,8 @@
 # app/settings.py
-from pydantic import Field
+import os
+from functools import lru_cache
+
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +12,7 @@ class Settings(BaseSettings):
         env_file=".env",
         case_sensitive=False,   # env var names can be upper/lower
         extra="ignore",         # ignore unknown env keys instead of crashing
+        frozen=True,            # read-only + hashable once loaded
     )
 
     # ---- General
@@ -16,51 +20,56 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
 
     # ---- Core services
-    postgres_url: str | None = Field(default=None, alias="POSTGRES_URL")
-    redis_url: str = Field(alias="REDIS_URL")
+    postgres_url: str | None = Field(default=None, validation_alias=AliasChoices("POSTGRES_URL", "postgres_url"))
+    redis_url: str = Field(validation_alias=AliasChoices("REDIS_URL", "redis_url"))
+    # SELECT 1 on every pool checkout; only worth it across flaky networks / long idles
+    db_pool_pre_ping: bool = Field(default=False, validation_alias=AliasChoices("DB_POOL_PRE_PING", "db_pool_pre_ping"))
+    # per engine, per process: every uvicorn/celery process opens a sync and an async pool,
+    # so peak connections = processes * 2 * (size + overflow); keep that under max_connections
+    db_pool_size: int = Field(default=5, validation_alias=AliasChoices("DB_POOL_SIZE", "db_pool_size"))
+    db_max_overflow: int = Field(default=5, validation_alias=AliasChoices("DB_MAX_OVERFLOW", "db_max_overflow"))
 
     # ---- Celery (optional; will fall back to redis_url if not provided)
-    celery_broker_url: str | None = Field(default=None, alias="CELERY_BROKER_URL")
-    celery_result_backend: str | None = Field(default=None, alias="CELERY_RESULT_BACKEND")
+    celery_broker_url: str | None = Field(default=None, validation_alias=AliasChoices("CELERY_BROKER_URL", "celery_broker_url"))
+    celery_result_backend: str | None = Field(default=None, validation_alias=AliasChoices("CELERY_RESULT_BACKEND", "celery_result_backend"))
 
     # ---- YouTube / Google
-    yt_api_key: str | None = Field(default=None, alias="YT_API_KEY")
-    yt_client_id: str | None = Field(default=None, alias="YT_CLIENT_ID")
-    yt_client_secret: str | None = Field(default=None, alias="YT_CLIENT_SECRET")
-    yt_refresh_token: str | None = Field(default=None, alias="YT_REFRESH_TOKEN")
+    yt_api_key: str | None = Field(default=None, validation_alias=AliasChoices("YT_API_KEY", "yt_api_key"))
+    yt_client_id: str | None = Field(default=None, validation_alias=AliasChoices("YT_CLIENT_ID", "yt_client_id"))
+    yt_client_secret: str | None = Field(default=None, validation_alias=AliasChoices("YT_CLIENT_SECRET", "yt_client_secret"))
+    yt_refresh_token: str | None = Field(default=None, validation_alias=AliasChoices("YT_REFRESH_TOKEN", "yt_refresh_token"))
+    # authorized-user JSON (client id/secret + refresh token); takes precedence over the three above
+    yt_oauth_file: str | None = Field(default=None, validation_alias=AliasChoices("YT_OAUTH_FILE", "yt_oauth_file"))
+
+    # resumable upload chunk size; must be a multiple of 256 KiB (bump on fat pipes)
+    yt_upload_chunk_bytes: int = Field(default=8 * 1024 * 1024, validation_alias=AliasChoices("YT_UPLOAD_CHUNK_BYTES", "yt_upload_chunk_bytes"))
+    # daily Data API budget per account; uploads are refused locally once it's spent
+    yt_daily_quota: int = Field(default=10_000, validation_alias=AliasChoices("YT_DAILY_QUOTA", "yt_daily_quota"))
+    # SO_SNDBUF/SO_RCVBUF for upload sockets. Unset = kernel autotuning (usually best);
+    # setting it disables autotuning and is capped at net.core.wmem_max/rmem_max
+    yt_upload_socket_buffer_bytes: int | None = Field(default=None, validation_alias=AliasChoices("YT_UPLOAD_SOCKET_BUFFER_BYTES", "yt_upload_socket_buffer_bytes"))
+    # parallel uploads in upload_many (per-user quotas make high values counter-productive)
+    yt_upload_concurrency: int = Field(default=4, validation_alias=AliasChoices("YT_UPLOAD_CONCURRENCY", "yt_upload_concurrency"))
 
     # ---- OpenAI
-    openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
+    openai_api_key: str | None = Field(default=None, validation_alias=AliasChoices("OPENAI_API_KEY", "openai_api_key"))
 
     # ---- S3 (optional)
-    s3_endpoint: str | None = Field(default=None, alias="S3_ENDPOINT")
-    s3_bucket: str | None = Field(default=None, alias="S3_BUCKET")
-    s3_key: str | None = Field(default=None, alias="S3_KEY")
-    s3_secret: str | None = Field(default=None, alias="S3_SECRET")
+    s3_endpoint: str | None = Field(default=None, validation_alias=AliasChoices("S3_ENDPOINT", "s3_endpoint"))
+    s3_bucket: str | None = Field(default=None, validation_alias=AliasChoices("S3_BUCKET", "s3_bucket"))
+    s3_key: str | None = Field(default=None, validation_alias=AliasChoices("S3_KEY", "s3_key"))
+    s3_secret: str | None = Field(default=None, validation_alias=AliasChoices("S3_SECRET", "s3_secret"))
 
     # ---- Feature flags
-    auto_pipeline_enabled: bool = Field(default=True, alias="AUTO_PIPELINE_ENABLED")
-    publish_enabled: bool = Field(default=False, alias="PUBLISH_ENABLED")
+    auto_pipeline_enabled: bool = Field(default=True, validation_alias=AliasChoices("AUTO_PIPELINE_ENABLED", "auto_pipeline_enabled"))
+    publish_enabled: bool = Field(default=False, validation_alias=AliasChoices("PUBLISH_ENABLED", "publish_enabled"))
 
-    # ---- Back-compat UPPERCASE read-only properties
-    @property
-    def YT_API_KEY(self) -> str | None: return self.yt_api_key
-    @property
-    def YT_CLIENT_ID(self) -> str | None: return self.yt_client_id
-    @property
-    def YT_CLIENT_SECRET(self) -> str | None: return self.yt_client_secret
-    @property
-    def YT_REFRESH_TOKEN(self) -> str | None: return self.yt_refresh_token
-    @property
-    def OPENAI_API_KEY(self) -> str | None: return self.openai_api_key
-    @property
-    def POSTGRES_URL(self) -> str | None: return self.postgres_url
-    @property
-    def REDIS_URL(self) -> str: return self.redis_url
-    @property
-    def PUBLISH_ENABLED(self) -> bool: return self.publish_enabled
-    @property
-    def AUTO_PIPELINE_ENABLED(self) -> bool: return self.auto_pipeline_enabled
+    # ---- Transcription (faster-whisper)
+    whisper_model: str = Field(default="large-v3", validation_alias=AliasChoices("WHISPER_MODEL", "whisper_model"))
+    whisper_batch_size: int = Field(default=16, validation_alias=AliasChoices("WHISPER_BATCH_SIZE", "whisper_batch_size"))
+
+    # ---- Rendering
+    render_nvenc: bool = Field(default=False, validation_alias=AliasChoices("RENDER_NVENC", "render_nvenc"))  # h264_nvenc on GPU workers
 
     # ---- Helpers for Celery wiring (prefer explicit env, fall back to REDIS_URL)
     @property
@@ -72,5 +81,13 @@ class Settings(BaseSettings):
         return self.celery_result_backend or self.redis_url
 
 
-# module-level singleton
-S = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # production config comes from the real environment; skip reading .env there
+    if os.getenv("APP_ENV", "").lower() == "production":
+        return Settings(_env_file=None)
+    return Settings()
+
+
+# module-level singleton (back-compat)
+S = get_settings()
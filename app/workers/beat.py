@@ -1,22 +1,61 @@
 # app/workers/beat.py
 # -------------------------------------------------
-# Celery Beat schedule: defines periodic tasks
-# (what to run automatically, and how often).
+# Periodic maintenance tasks. The Beat schedule itself
+# lives in app/queues.py (single source of truth).
 # -------------------------------------------------
 
-from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterator, Tuple
+import logging
+import os
 import shutil
 import time
 
 from celery import shared_task
-from app.queues import celery_app
+
+log = logging.getLogger(__name__)
 
 
 # -------------------------------
 # Periodic tasks
 # -------------------------------
 
+_REMOVE_WORKERS = 8
+_REMOVE_BATCH = 256
+
+
+def _expired_entries(d: Path, cutoff: float) -> Iterator[Tuple[str, bool]]:
+    """Yield (path, is_dir) for entries of `d` last modified before `cutoff`."""
+    # scandir reuses d_type for is_file/is_dir, so each entry costs one lstat
+    with os.scandir(d) as it:
+        for entry in it:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    yield entry.path, False
+                # old directories (e.g., per-clip folders if you create any)
+                elif entry.is_dir(follow_symlinks=False):
+                    yield entry.path, True
+            except OSError as e:
+                log.warning("[cleanup_tmp] Failed to stat %s: %s", entry.path, e)
+
+
+def _remove_one(item: Tuple[str, bool]) -> bool:
+    path, is_dir = item
+    try:
+        if is_dir:
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+        return True
+    except Exception as e:
+        log.warning("[cleanup_tmp] Failed to remove %s: %s", path, e)
+        return False
+
+
 @shared_task
 def cleanup_tmp(max_age_hours: int = 24) -> int:
     """
@@ -28,60 +67,13 @@ def cleanup_tmp(max_age_hours: int = 24) -> int:
     deleted = 0
 
     # Ensure expected subdirs exist
-    for subdir in ("media", "clips"):
-        d = base / subdir
-        if not d.exists():
-            continue
+    dirs = [base / subdir for subdir in ("media", "clips") if (base / subdir).exists()]
+    expired = chain.from_iterable(_expired_entries(d, cutoff) for d in dirs)
 
-        for f in d.iterdir():
-            try:
-                # Delete old files
-                if f.is_file() and f.stat().st_mtime < cutoff:
-                    f.unlink()
-                    deleted += 1
-                # Delete old directories (e.g., per-clip folders if you create any)
-                elif f.is_dir() and f.stat().st_mtime < cutoff:
-                    shutil.rmtree(f)
-                    deleted += 1
-            except Exception as e:
-                print(f"[cleanup_tmp] Failed to remove {f}: {e}")
+    # unlink/rmtree release the GIL, so removals overlap on a small thread pool;
+    # entries are fed in fixed-size batches to keep memory bounded
+    with ThreadPoolExecutor(max_workers=_REMOVE_WORKERS) as pool:
+        while batch := list(islice(expired, _REMOVE_BATCH)):
+            deleted += sum(pool.map(_remove_one, batch))
 
     return deleted
-
-
-# -------------------------------
-# Celery Beat schedule
-# -------------------------------
-
-# Base schedule: you can keep both poll-only and auto-pipeline, or
-# remove the poll job once auto-pipeline is stable.
-celery_app.conf.beat_schedule = {
-    # Run the allowlist poller every 10 minutes (debugging/visibility)
-    "poll-creators-every-10-min": {
-        "task": "app.workers.tasks.poll_creators",
-        "schedule": timedelta(minutes=10),
-    },
-    # Cleanup old tmp files every 6 hours
-    "cleanup-tmp-every-6h": {
-        "task": "app.workers.beat.cleanup_tmp",
-        "schedule": timedelta(hours=6),
-        "args": (24,),  # delete files older than 24 hours
-    },
-}
-
-# Add the end-to-end auto pipeline & campaign discovery
-celery_app.conf.beat_schedule.update({
-    # End-to-end: find new videos & enqueue full pipeline every 10 minutes
-    "auto-pipeline-every-10-min": {
-        "task": "app.workers.tasks.auto_pipeline",
-        "schedule": timedelta(minutes=10),
-    },
-    # Discover new campaigns daily (writes proposals to tmp/state/)
-    "discover-campaigns-every-day": {
-        "task": "app.workers.tasks.discover_campaigns_task",
-        "schedule": timedelta(days=1),
-    },
-})
-
-# Use UTC unless you have a specific reason not to
-celery_app.conf.timezone = "UTC"
@@ -6,8 +6,10 @@
 
 from __future__ import annotations
 
-import os
-from celery import shared_task, chain
+import logging
+import time
+from celery import shared_task, chain, group
+from celery.utils.time import get_exponential_backoff_interval
 from app.settings import S
 from app.queues import celery_app  # noqa: F401  (import for side effects)
 
@@ -27,14 +29,17 @@ from app.services.clipper.ranker_llm import pick_top_segments
 
 # Rendering & publishing
 from app.services.editor.ffmpeg_ops import render_clip
-from app.services.publisher.youtube_upload import upload_short
-from app.services.monitor.claims import check_claim_then_publish
+from app.services.publisher.youtube_upload import is_transient, upload_short
+from app.services.publisher.quota import QuotaExhausted
+from app.services.monitor import claims
 
 # Campaign discovery (proposes allowlist entries)
 from app.services.intake.campaign_watcher import propose_allowlist_updates
 
+log = logging.getLogger(__name__)
 
-@shared_task
+
+@shared_task(ignore_result=False)  # smoke test reads the result back
 def ping() -> str:
     """Simple smoke test to verify worker is alive."""
     return "pong"
@@ -47,14 +52,16 @@ def poll_creators() -> list[str]:
     - Reads config/allowlist.yaml
     - Hits YouTube Data API to find recent uploads
     - Returns only unseen IDs (tracked in tmp/state/seen_videos.txt)
+    Read-only: it doesn't mark them seen, so it never takes videos away from
+    auto_pipeline (paused or not).
     """
-    return list_new_videos()
+    return list_new_videos(mark_seen=False)
 
 
 @shared_task
-def process_video(video_id: str) -> list[dict]:
+def process_video(video_id: str) -> dict:
     """
-    Process a single source video and return a list of rendered clip records.
+    Analyze a single source video and pick the segments to render.
 
     Steps:
       1) Download the source media (with permission) → mp4 path
@@ -63,9 +70,9 @@ def process_video(video_id: str) -> list[dict]:
       4) Fuse candidates (scene + transcript hotspots + audio peaks)
       5) Score candidates (energy/keywords/sentiment/pace/len-fit)
       6) Ask LLM to pick top N highlights & suggest titles
-      7) Render each chosen segment with ffmpeg (vertical, subs later)
     Returns:
-      A list of clip dicts: [{"clip_id","path","start","end","dur","title","reason"}, ...]
+      {"video_id", "media_path", "transcript_text", "selected": [seg, ...]}
+      for expand_and_render, which renders the segments in parallel.
     """
     # 1) Download
     media_path = fetch_video_media(video_id)
@@ -76,7 +83,7 @@ def process_video(video_id: str) -> list[dict]:
     # 3) Scene detection (visual cuts) → coarse windows
     scene_candidates = find_candidate_segments(media_path, transcript_text)
 
-    # 4) Fuse with transcript hotspots (+ optional audio peaks via pydub)
+    # 4) Fuse with transcript hotspots (+ optional audio peaks via ffmpeg)
     candidates = make_candidates(
         media_path,
         asr_json_path,
@@ -100,58 +107,136 @@ def process_video(video_id: str) -> list[dict]:
         top_n=3,        # render up to 3 clips per source video
     )
 
-    # 7) Render each selected segment → final mp4s
-    clip_records: list[dict] = []
-    for seg in selected:
-        clip = render_clip(media_path, transcript_text, seg)
-        clip_records.append(clip)
+    return {
+        "video_id": video_id,
+        "media_path": media_path,
+        "transcript_text": transcript_text,
+        "selected": selected,
+    }
 
-    if not S.publish_enabled:
-        print(f"[SAFE MODE] Finished processing {video_id}, rendered {len(clip_records)} clips. Upload skipped.")
-    else:
-        print(f"[LIVE MODE] Finished processing {video_id}, rendered {len(clip_records)} clips. Upload will be enqueued.")
 
-    return clip_records
+@shared_task(bind=True)
+def expand_and_render(self, job: dict) -> list[dict]:
+    """
+    7) Render each selected segment with ffmpeg (vertical, subs later), one
+    render_clip_task per segment on the cpu queue. This task replaces itself
+    with the group, which Celery turns into a chord: the next step in the chain
+    (publish_many) receives all clip dicts once every render has finished.
+    """
+    selected = job["selected"]
+    mode = "[SAFE MODE]" if not S.publish_enabled else "[LIVE MODE]"
+    log.info("%s Processed %s, rendering %s clips.", mode, job["video_id"], len(selected))
+    if not selected:
+        return []
+    return self.replace(group(
+        render_clip_task.s(job["media_path"], job["transcript_text"], seg) for seg in selected
+    ))
 
 
-@shared_task
-def publish_clip(clip: dict) -> dict:
+@shared_task(ignore_result=False)  # results are collected by the chord
+def render_clip_task(media_path: str, transcript_text: str, seg: dict) -> dict:
+    """Render one selected segment → clip dict (see render_clip)."""
+    return render_clip(media_path, transcript_text, seg)
+
+
+# Quota waits are re-checked at least hourly: Redis redelivers ETA tasks held
+# longer than the broker visibility_timeout (5400s).
+QUOTA_RETRY_MAX_S = 3600
+
+
+# Whole-upload retries for transient failures that outlived upload_short's own
+# per-request retries: 60s, 120s, ... capped at 1h, full jitter. Counted on the clip
+# (not self.request.retries, which quota waits also bump).
+PUBLISH_MAX_RETRIES = 3
+PUBLISH_RETRY_BACKOFF_S = 60
+PUBLISH_RETRY_BACKOFF_MAX_S = 3600
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,  # redelivered if the uploader dies; the saved session resumes it
+)
+def publish_clip(self, clip: dict) -> dict:
     """
     Upload one rendered clip to YouTube as UNLISTED, then schedule a flip to PUBLIC.
     Respects publish_enabled flag (safe mode).
+
+    Runs on its own `upload` queue so slow uploads never hold up render workers.
+    When the local quota ledger says no, the task is re-queued for when quota is
+    back (hours, possibly) instead of failing the clip. Only connection errors,
+    timeouts and 429/5xx are retried; 4xx and missing files fail fast, since each
+    retry would charge another videos.insert to the quota ledger.
     """
     if not S.publish_enabled:
-        print(f"[SAFE MODE] Skipping upload for clip {clip.get('clip_id')} ({clip.get('path')})")
+        log.info("[SAFE MODE] Skipping upload for clip %s (%s)", clip.get("clip_id"), clip.get("path"))
         return {"status": "skipped", "clip": clip}
 
-    uploaded = upload_short(clip, visibility="unlisted")
-
-    # Schedule a claim check / flip to public after a 30 min hold.
-    check_claim_then_publish.apply_async(args=[uploaded["video_id"]], countdown=1800)
+    try:
+        uploaded = upload_short(clip, visibility="unlisted")
+    except QuotaExhausted as e:
+        countdown = min(int(e.retry_after) + 1, QUOTA_RETRY_MAX_S)
+        log.info("[publish] %s; retrying clip %s in %ss", e, clip.get("clip_id"), countdown)
+        raise self.retry(exc=e, countdown=countdown, max_retries=None)
+    except Exception as e:
+        failures = clip.get("upload_failures", 0)
+        if not is_transient(e) or failures >= PUBLISH_MAX_RETRIES:
+            raise
+        countdown = get_exponential_backoff_interval(
+            PUBLISH_RETRY_BACKOFF_S, failures, PUBLISH_RETRY_BACKOFF_MAX_S, full_jitter=True
+        )
+        log.warning("[publish] clip %s failed transiently (%s); retrying in %ss", clip.get("clip_id"), e, countdown)
+        raise self.retry(exc=e, args=[{**clip, "upload_failures": failures + 1}], countdown=countdown, max_retries=None)
+
+    # Schedule the first claim check; it backs off on its own until resolved.
+    check_claim_then_publish.apply_async(args=[uploaded["video_id"], 0], countdown=claims.next_check_delay(0))
     return uploaded
 
+
+@shared_task
+def check_claim_then_publish(video_id: str, attempt: int = 0) -> dict:
+    """
+    Poll an uploaded clip's claim/processing status and flip it to PUBLIC once
+    clean. While still pending (or the check/flip failed), re-enqueue itself with
+    exponential backoff (capped at 1h) up to CLAIM_CHECK_MAX_ATTEMPTS checks.
+    The final outcome (including giving up) is recorded on the clip.
+    """
+    result = claims.check_claim_then_publish(video_id)
+    if result["status"] in claims.RETRY_STATUSES:
+        if attempt + 1 < claims.CLAIM_CHECK_MAX_ATTEMPTS:
+            check_claim_then_publish.apply_async(
+                args=[video_id, attempt + 1], countdown=claims.next_check_delay(attempt + 1)
+            )
+            return result
+        log.warning("[claims] giving up on %s after %s checks (last status: %s); left unlisted",
+                    video_id, attempt + 1, result["status"])
+        result = {**result, "status": claims.GAVE_UP}
+    claims.record_outcome(video_id, result["status"])
+    return result
+
 @shared_task
 def publish_many(clips: list[dict]) -> list[str]:
     """
     Fan-out: enqueue one publish task per rendered clip.
     Returns a list of Celery task IDs (not YouTube video IDs).
     """
-    task_ids: list[str] = []
-    for clip in clips:
-        async_res = publish_clip.delay(clip)
-        task_ids.append(async_res.id)
-    return task_ids
+    if not clips:
+        return []
+    # one group → one pipelined batch of broker writes instead of a round-trip per clip
+    res = group(publish_clip.s(clip) for clip in clips).apply_async()
+    return [r.id for r in res.results]
 
 
 def enqueue_video_pipeline(video_id: str) -> None:
     """
     Orchestrates the pipeline for a single video:
-      process_video(video_id) → returns [clip_dict...]
+      process_video(video_id) → analysis + selected segments
+      expand_and_render(job) → parallel renders (chord) → [clip_dict...]
       publish_many([clip_dict...]) → enqueues uploads per clip
     """
-    print(f"[pipeline] enqueue video_id={video_id}")
+    log.info("[pipeline] enqueue video_id=%s", video_id)
     chain(
         process_video.s(video_id),
+        expand_and_render.s(),
         publish_many.s(),
     )()
 
@@ -160,27 +245,57 @@ def enqueue_video_pipeline(video_id: str) -> None:
 # Periodic wrappers (used by Beat)
 # -------------------------------
 
+# Runtime kill-switch: `SET flags:auto_pipeline 0|1` in Redis overrides
+# S.auto_pipeline_enabled without a worker restart. Cached briefly per process.
+AUTO_PIPELINE_FLAG_KEY = "flags:auto_pipeline"
+_FLAG_TTL_S = 30.0
+_flag_cache: tuple[float, bool] | None = None  # (expires_at, value)
+_redis = None
+
+
+def _auto_pipeline_enabled() -> bool:
+    global _flag_cache, _redis
+    now = time.monotonic()
+    if _flag_cache is not None and _flag_cache[0] > now:
+        return _flag_cache[1]
+    enabled = S.auto_pipeline_enabled
+    try:
+        if _redis is None:
+            import redis
+            _redis = redis.Redis.from_url(S.redis_url, socket_timeout=2)
+        raw = _redis.get(AUTO_PIPELINE_FLAG_KEY)
+        if raw is not None:
+            enabled = raw.strip().lower() in (b"1", b"true", b"on", b"yes")
+    except Exception as e:
+        log.warning("[auto_pipeline] flag lookup failed, using settings: %s", e)
+    _flag_cache = (now + _FLAG_TTL_S, enabled)
+    return enabled
+
+
 @shared_task
 def auto_pipeline() -> dict:
     """
     Periodic: fetch new video IDs and kick the full pipeline for each.
-    Controlled by AUTO_PIPELINE_ENABLED env var (default: on).
+    Controlled by S.auto_pipeline_enabled (AUTO_PIPELINE_ENABLED, default: on),
+    overridable at runtime via the Redis key flags:auto_pipeline.
+
+    While disabled it doesn't poll at all, so new videos stay unseen and are
+    picked up once the pipeline is switched back on.
 
     Returns a summary:
       {"found": <int>, "enqueued": <int>, "video_ids": [...]}
     """
-    ids = poll_creators.apply().get()  # run inline for visible logs
-    enqueued = 0
-
-    if os.getenv("AUTO_PIPELINE_ENABLED", "1") not in ("1", "true", "True"):
-        return {"found": len(ids), "enqueued": 0, "video_ids": ids}
+    if not _auto_pipeline_enabled():
+        return {"found": 0, "enqueued": 0, "video_ids": []}
 
+    ids = list_new_videos()  # already local: skip the Celery apply/result round-trip
+    enqueued = 0
     for vid in ids:
         try:
             enqueue_video_pipeline(vid)
             enqueued += 1
         except Exception as e:
-            print(f"[auto_pipeline] failed to enqueue {vid}: {e}")
+            log.warning("[auto_pipeline] failed to enqueue %s: %s", vid, e)
 
     return {"found": len(ids), "enqueued": enqueued, "video_ids": ids}
 
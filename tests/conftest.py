@@ -0,0 +1,4 @@
+import os
+
+# app.settings requires REDIS_URL at import time; tests never talk to Redis
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
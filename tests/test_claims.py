@@ -0,0 +1,137 @@
+import pytest
+
+for _dep in ("orjson", "pydantic_settings", "requests", "googleapiclient", "xxhash"):
+    pytest.importorskip(_dep)
+
+import orjson  # noqa: E402
+
+from app.services.monitor import claims  # noqa: E402
+from app.services.publisher import quota, youtube_upload  # noqa: E402
+
+
+class _Response:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+class _FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def put(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return _Response()
+
+
+class _ReadOnlyClient:
+    """The API-key client: reads are fine, writes would 401."""
+
+    def videos(self):
+        return self
+
+    def update(self, **_kwargs):
+        raise AssertionError("videos.update must not go through the API-key client")
+
+
+@pytest.fixture
+def oauth_session(monkeypatch, tmp_path):
+    monkeypatch.setattr(quota, "QUOTA_FILE", tmp_path / "quota.json")
+    monkeypatch.setattr(quota, "LOCK_FILE", tmp_path / "quota.lock")
+    session = _FakeSession()
+    monkeypatch.setattr(youtube_upload, "_upload_session", lambda: session)
+    monkeypatch.setattr(claims, "yt_client", lambda: _ReadOnlyClient())
+    return session
+
+
+def test_clean_video_is_flipped_public_over_oauth(monkeypatch, oauth_session):
+    monkeypatch.setattr(claims, "claim_status", lambda _vid: "clean")
+
+    result = claims.check_claim_then_publish("abc123")
+
+    assert result == {"video_id": "abc123", "status": "clean"}
+    [(url, kwargs)] = oauth_session.calls
+    assert url == youtube_upload.VIDEOS_URL
+    assert kwargs["params"]["part"] == "status"
+    body = orjson.loads(kwargs["data"])
+    assert body["id"] == "abc123"
+    assert body["status"]["privacyStatus"] == "public"
+
+
+def test_pending_video_is_left_alone(monkeypatch, oauth_session):
+    monkeypatch.setattr(claims, "claim_status", lambda _vid: "pending")
+
+    assert claims.check_claim_then_publish("abc123")["status"] == "pending"
+    assert oauth_session.calls == []
+
+
+def test_failed_flip_is_reported_for_retry(monkeypatch, oauth_session):
+    import requests
+
+    def _fail(*_args, **_kwargs):
+        raise requests.HTTPError("403")
+
+    monkeypatch.setattr(claims, "claim_status", lambda _vid: "clean")
+    monkeypatch.setattr(claims, "set_privacy", _fail)
+
+    assert claims.check_claim_then_publish("abc123")["status"] == "publish_failed"
+
+
+class _ListClient:
+    """API-key client whose videos.list answers with `items` (or raises `error`)."""
+
+    def __init__(self, items=None, error=None):
+        self.items, self.error = items or [], error
+
+    def videos(self):
+        return self
+
+    def list(self, **_kwargs):
+        return self
+
+    def execute(self):
+        if self.error is not None:
+            raise self.error
+        return {"items": self.items}
+
+
+@pytest.mark.parametrize("upload_status, expected", [
+    ("uploaded", "pending"),
+    ("processed", "clean"),
+    ("rejected", "claimed"),
+    ("failed", "failed"),
+    ("deleted", "failed"),
+])
+def test_claim_status_mapping(monkeypatch, upload_status, expected):
+    client = _ListClient(items=[{"status": {"uploadStatus": upload_status}}])
+    monkeypatch.setattr(claims, "yt_client", lambda: client)
+
+    assert claims.claim_status("abc123") == expected
+
+
+def test_terminal_statuses_are_not_retried():
+    for status in ("clean", "claimed", "failed", "missing"):
+        assert status not in claims.RETRY_STATUSES
+
+
+def test_status_lookup_error_is_reported_for_retry(monkeypatch, oauth_session):
+    monkeypatch.setattr(claims, "yt_client", lambda: _ListClient(error=ConnectionResetError("reset")))
+
+    result = claims.check_claim_then_publish("abc123")
+
+    assert result["status"] == "check_failed"
+    assert result["status"] in claims.RETRY_STATUSES
+    assert oauth_session.calls == []
+
+
+def test_outcome_is_recorded_without_db(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    monkeypatch.setattr(claims, "S", SimpleNamespace(postgres_url=None))
+    monkeypatch.setattr(claims, "OUTCOMES_FILE", tmp_path / "claim_outcomes.jsonl")
+
+    claims.record_outcome("abc123", claims.GAVE_UP)
+
+    [line] = (tmp_path / "claim_outcomes.jsonl").read_text().splitlines()
+    assert orjson.loads(line)["status"] == "unresolved"
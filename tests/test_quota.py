@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import json
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.publisher import quota  # noqa: E402
+
+
+class _Clock:
+    """Stands in for both quota.datetime (now) and quota.time (time)."""
+
+    def __init__(self, start: datetime):
+        self.now_dt = start
+
+    def advance(self, seconds: float) -> None:
+        self.now_dt = datetime.fromtimestamp(self.now_dt.timestamp() + seconds, timezone.utc)
+
+    def time(self) -> float:
+        return self.now_dt.timestamp()
+
+
+@pytest.fixture
+def clock(monkeypatch, tmp_path):
+    # 06:00 UTC on Oct 16 is 23:00 PDT on Oct 15: an hour before the quota resets
+    c = _Clock(datetime(2026, 10, 16, 6, 0, tzinfo=timezone.utc))
+
+    class _FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return c.now_dt.astimezone(tz)
+
+    monkeypatch.setattr(quota, "datetime", _FrozenDatetime)
+    monkeypatch.setattr(quota, "time", c)
+    monkeypatch.setattr(quota, "S", SimpleNamespace(yt_daily_quota=2 * quota.VIDEOS_INSERT_UNITS))
+    monkeypatch.setattr(quota, "QUOTA_FILE", tmp_path / "quota.json")
+    monkeypatch.setattr(quota, "LOCK_FILE", tmp_path / "quota.lock")
+    return c
+
+
+def test_budget_is_enforced_until_pacific_midnight(clock):
+    quota.reserve("acct")
+    quota.reserve("acct")
+    with pytest.raises(quota.QuotaExhausted) as exc:
+        quota.reserve("acct")
+    assert exc.value.retry_after == pytest.approx(3600)
+
+    # other accounts have their own budget
+    quota.reserve("other")
+
+
+def test_day_rollover_resets_and_prunes_old_days(clock):
+    quota.reserve("acct")
+    quota.reserve("acct")
+    clock.advance(3600)  # 00:00 PDT: quota day rolls over
+    quota.reserve("acct")
+    quota.reserve("other")
+
+    spent = json.loads(quota.QUOTA_FILE.read_text())["spent"]
+    assert spent == {
+        "acct:2026-10-16": quota.VIDEOS_INSERT_UNITS,
+        "other:2026-10-16": quota.VIDEOS_INSERT_UNITS,
+    }
+
+
+def test_utc_midnight_is_not_a_reset(clock):
+    # 00:30 UTC on Oct 16 is still 17:30 PDT on Oct 15: same quota day as 23:30 UTC
+    clock.now_dt = datetime(2026, 10, 15, 23, 30, tzinfo=timezone.utc)
+    quota.reserve("acct")
+    quota.reserve("acct")
+    clock.advance(3600)
+    with pytest.raises(quota.QuotaExhausted) as exc:
+        quota.reserve("acct")
+    assert exc.value.retry_after == pytest.approx(6.5 * 3600)  # to 00:00 PDT = 07:00 UTC
+
+    spent = json.loads(quota.QUOTA_FILE.read_text())["spent"]
+    assert list(spent) == ["acct:2026-10-15"]
+
+
+def test_reset_follows_dst(clock):
+    # Nov 1 2026 is 25 hours long in Pacific time (PDT -> PST at 02:00)
+    clock.now_dt = datetime(2026, 11, 1, 7, 30, tzinfo=timezone.utc)  # 00:30 PDT
+    assert quota._seconds_to_quota_reset() == pytest.approx(24.5 * 3600)  # to 00:00 PST = 08:00 UTC Nov 2
+
+
+def test_block_window(clock):
+    quota.block("acct", seconds=600)
+    with pytest.raises(quota.QuotaExhausted) as exc:
+        quota.reserve("acct")
+    assert exc.value.retry_after == pytest.approx(600)
+
+    # only that account's method is blocked, and nothing was charged
+    quota.reserve("acct", method=quota.VIDEOS_UPDATE, units=quota.VIDEOS_UPDATE_UNITS)
+    quota.reserve("other")
+
+    clock.advance(601)
+    quota.reserve("acct")
+
+    spent = json.loads(quota.QUOTA_FILE.read_text())["spent"]
+    assert spent["acct:2026-10-15"] == quota.VIDEOS_UPDATE_UNITS + quota.VIDEOS_INSERT_UNITS
+
+
+def test_expired_blocks_are_pruned(clock):
+    quota.block("acct", seconds=60)
+    clock.advance(61)
+    quota.block("other", seconds=60)
+
+    blocked = json.loads(quota.QUOTA_FILE.read_text())["blocked"]
+    assert list(blocked) == [f"other:{quota.VIDEOS_INSERT}"]
@@ -0,0 +1,165 @@
+import os
+
+import pytest
+
+for _dep in ("orjson", "pydantic_settings", "requests", "googleapiclient", "xxhash"):
+    pytest.importorskip(_dep)
+
+import orjson  # noqa: E402
+
+from app.services.publisher import youtube_upload  # noqa: E402
+
+ALIGN = youtube_upload.CHUNK_ALIGN
+
+
+class _Resp:
+    def __init__(self, status_code: int, headers: dict | None = None, content: bytes = b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(str(self.status_code), response=self)
+
+
+class _FakeSession:
+    """
+    A resumable upload session: keeps the bytes it accepted and answers each data
+    PUT according to `script` ("ok" when the script runs out).
+    """
+
+    def __init__(self, size: int, script=()):
+        self.size = size
+        self.data = bytearray()
+        self.script = list(script)
+        self.puts: list[tuple[int, int]] = []  # (first byte, length) of each data PUT
+
+    def _status(self) -> _Resp:
+        if len(self.data) == self.size:
+            return _Resp(200, content=orjson.dumps({"id": "vid123"}))
+        return _Resp(308, {"Range": f"bytes=0-{len(self.data) - 1}"} if self.data else {})
+
+    def put(self, url, data=None, headers=None, **_kwargs):
+        content_range = headers["Content-Range"]
+        if content_range.startswith("bytes */"):
+            return self._status()
+        first, last = map(int, content_range.split()[1].split("/")[0].split("-"))
+        assert first == len(self.data), "client must send from the committed offset"
+        assert len(data) == last - first + 1
+        self.puts.append((first, len(data)))
+        action = self.script.pop(0) if self.script else "ok"
+        if action == "503":
+            return _Resp(503)
+        if action == "keep_first_align":  # server commits less than it was sent
+            self.data += data[:ALIGN]
+            return self._status()
+        if action == "lose_all":  # 308 with no Range: nothing committed
+            self.data.clear()
+            return _Resp(308)
+        self.data += data
+        if action == "ok_then_503":  # stored everything, but the response got lost
+            return _Resp(503)
+        return self._status()
+
+
+@pytest.fixture
+def clip_file(tmp_path):
+    def make(size: int):
+        path = tmp_path / "clip.mp4"
+        payload = os.urandom(size)
+        path.write_bytes(payload)
+        return path, payload
+    return make
+
+
+@pytest.fixture(autouse=True)
+def _fast(monkeypatch):
+    monkeypatch.setattr(youtube_upload, "_chunk_size", lambda: ALIGN)
+    monkeypatch.setattr(youtube_upload, "_backoff_delay", lambda _attempt: 0)
+    # fixed chunk size unless a test scripts the resizes
+    monkeypatch.setattr(youtube_upload, "_next_chunk_size", lambda chunk, _dt: chunk)
+
+
+def _upload(session, path, offset=0):
+    with open(path, "rb") as fh:
+        return youtube_upload._put_chunks(session, "https://upload/session", fh, session.size, offset)
+
+
+def test_chunk_is_topped_up_and_trimmed_after_resize(monkeypatch, clip_file):
+    # prefetches are issued at the old size; the next PUT must use the new one
+    sizes = iter([4 * ALIGN, ALIGN, 2 * ALIGN])
+    monkeypatch.setattr(youtube_upload, "_next_chunk_size", lambda _chunk, _dt: next(sizes, 2 * ALIGN))
+    path, payload = clip_file(ALIGN + 4 * ALIGN + ALIGN + 2 * ALIGN + 12345)
+    session = _FakeSession(len(payload))
+
+    assert _upload(session, path) == {"id": "vid123"}
+    assert bytes(session.data) == payload
+    assert [n for _, n in session.puts] == [ALIGN, 4 * ALIGN, ALIGN, 2 * ALIGN, 12345]
+
+
+def test_resends_from_offset_when_server_rewinds(monkeypatch, clip_file):
+    monkeypatch.setattr(youtube_upload, "_next_chunk_size", lambda _chunk, _dt: 2 * ALIGN)
+    path, payload = clip_file(3 * ALIGN)
+    session = _FakeSession(len(payload), script=["ok", "keep_first_align"])
+
+    _upload(session, path)
+
+    assert bytes(session.data) == payload
+    assert session.puts == [(0, ALIGN), (ALIGN, 2 * ALIGN), (2 * ALIGN, ALIGN)]
+
+
+def test_308_without_range_restarts_from_zero(clip_file):
+    path, payload = clip_file(2 * ALIGN)
+    session = _FakeSession(len(payload), script=["ok", "lose_all"])
+
+    _upload(session, path)
+
+    assert bytes(session.data) == payload
+    assert [first for first, _ in session.puts] == [0, ALIGN, 0, ALIGN]
+
+
+def test_retry_resumes_from_committed_offset(clip_file):
+    path, payload = clip_file(3 * ALIGN)
+    session = _FakeSession(len(payload), script=["ok", "503", "503"])
+
+    _upload(session, path)
+
+    assert bytes(session.data) == payload
+    assert [first for first, _ in session.puts] == [0, ALIGN, ALIGN, ALIGN, 2 * ALIGN]
+
+
+def test_done_on_status_query(clip_file):
+    path, payload = clip_file(2 * ALIGN)
+    session = _FakeSession(len(payload), script=["ok", "ok_then_503"])
+
+    assert _upload(session, path) == {"id": "vid123"}
+    assert len(session.puts) == 2  # the status query found it complete; nothing resent
+
+
+def test_resume_from_saved_offset(clip_file):
+    path, payload = clip_file(3 * ALIGN)
+    session = _FakeSession(len(payload))
+    session.data += payload[:ALIGN]  # committed by a previous (crashed) attempt
+
+    _upload(session, path, offset=ALIGN)
+
+    assert bytes(session.data) == payload
+    assert session.puts[0][0] == ALIGN
+
+
+def test_gives_up_after_max_retries(clip_file):
+    import requests
+
+    path, payload = clip_file(2 * ALIGN)
+    session = _FakeSession(len(payload), script=["503"] * (youtube_upload.MAX_CHUNK_RETRIES + 1))
+
+    with pytest.raises(requests.HTTPError):
+        _upload(session, path)
+    assert len(session.puts) == youtube_upload.MAX_CHUNK_RETRIES + 1
+
+
+def test_committed_parses_range():
+    assert youtube_upload._committed(None) == 0
+    assert youtube_upload._committed("bytes=0-262143") == ALIGN